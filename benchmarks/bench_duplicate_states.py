@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from facts import *
+from experta import *
+from experta.strategies import DepthStrategy
+from state_buckets import StateBuckets
+from Dfs.engine_constraints import BridgePuzzleSolverConstraints
+
+
+class CountingStrategy(DepthStrategy):
+    def __init__(self):
+        super().__init__()
+        self.activations = Counter()
+
+    def _update_agenda(self, agenda, added, removed):
+        for activation in added:
+            self.activations[activation.rule.__name__] += 1
+        super()._update_agenda(agenda, added, removed)
+
+
+pairwise_comparisons = Counter()
+
+
+def same_signature_and_worse(
+    left1,
+    flashlight_location1,
+    left2,
+    flashlight_location2,
+    depth1,
+    depth2,
+    elapsed_time1,
+    elapsed_time2,
+):
+    pairwise_comparisons["tests"] += 1
+    return (
+        left1 == left2
+        and flashlight_location1 == flashlight_location2
+        and depth1 != depth2
+        and elapsed_time1 > elapsed_time2
+    )
+
+
+class PairwiseDuplicates(KnowledgeEngine):
+    def __init__(self):
+        super().__init__()
+        self.strategy = CountingStrategy()
+        pairwise_comparisons.clear()
+
+    @property
+    def comparisons(self):
+        return pairwise_comparisons["tests"]
+
+    @Rule(
+        AS.state1
+        << State(
+            left=MATCH.left1,
+            flashlight_location=MATCH.flashlight_location1,
+            elapsed_time=MATCH.elapsed_time1,
+            depth=MATCH.depth1,
+        ),
+        AS.state2
+        << State(
+            left=MATCH.left2,
+            flashlight_location=MATCH.flashlight_location2,
+            elapsed_time=MATCH.elapsed_time2,
+            depth=MATCH.depth2,
+        ),
+        TEST(same_signature_and_worse),
+    )
+    def duplicate_state_elimination(self, state1):
+        self.declare(
+            StateToRetract(
+                state_id=state1.__factid__,
+                violation_type="DUPLICATE_STATE",
+                details="pairwise",
+            )
+        )
+
+
+class BucketedDuplicates(KnowledgeEngine):
+    duplicate_state_elimination = (
+        BridgePuzzleSolverConstraints.duplicate_state_elimination
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.strategy = CountingStrategy()
+        self.state_buckets = StateBuckets()
+
+    @property
+    def comparisons(self):
+        return self.state_buckets.comparisons
+
+
+def synthetic_states(count, people, seed):
+    rng = random.Random(seed)
+    signatures = max(1, count // 4)
+    keys = [
+        (rng.getrandbits(people), rng.randint(LEFT, RIGHT)) for _ in range(signatures)
+    ]
+    full_mask = (1 << people) - 1
+    states = []
+    for sequence in range(count):
+        left, flashlight_location = rng.choice(keys)
+        states.append(
+            State(
+                left=left,
+                right=full_mask & ~left,
+                flashlight_location=flashlight_location,
+                elapsed_time=float(rng.randint(1, 60)),
+                path=[("cross", sequence, 0.0)],
+                depth=rng.randint(1, 12),
+            )
+        )
+    return states
+
+
+def measure(engine_class, states):
+    engine = engine_class()
+    engine.reset()
+    started = time.perf_counter()
+    for state in states:
+        engine.declare(state.copy())
+    engine.run()
+    elapsed = time.perf_counter() - started
+    return {
+        "activations": engine.strategy.activations["duplicate_state_elimination"],
+        "comparisons": engine.comparisons,
+        "seconds": round(elapsed, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare pairwise and bucketed duplicate-state elimination."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400, 800])
+    parser.add_argument("--people", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'states':>8} {'rule':>9} {'activations':>12} {'comparisons':>12} {'seconds':>9}"
+    )
+    for size in args.sizes:
+        states = synthetic_states(size, args.people, args.seed)
+        for label, engine_class in (
+            ("pairwise", PairwiseDuplicates),
+            ("bucketed", BucketedDuplicates),
+        ):
+            row = {"states": size, "rule": label, **measure(engine_class, states)}
+            results.append(row)
+            print(
+                f"{size:>8} {label:>9} {row['activations']:>12} "
+                f"{row['comparisons']:>12} {row['seconds']:>9}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from Dfs.engine import BridgePuzzleSolver
+from metrics import instrument
+from oracle import optimal_time
+from sampling import random_roster
+from search_log import SearchLog
+
+EXPANSION_RULES = ("cross_left_to_right", "return_right_to_left", "expand_state")
+
+
+def measure(people, max_time, capacity, fused, lifecycle):
+    engine = instrument(BridgePuzzleSolver)(
+        people,
+        max_time,
+        capacity,
+        fused=fused,
+        lifecycle=lifecycle,
+        log=SearchLog("off"),
+    )
+    engine.solve()
+    metrics = engine.metrics
+    expanded = sum(metrics.firings[rule] for rule in EXPANSION_RULES) or 1
+    return {
+        "expanded": expanded,
+        "rules_fired": metrics.rules_fired,
+        "facts_declared": metrics.facts_declared,
+        "fired_per_node": round(metrics.rules_fired / expanded, 2),
+        "declared_per_node": round(metrics.facts_declared / expanded, 2),
+        "peak_facts": metrics.peak_facts,
+        "seconds": round(metrics.wall_time, 4),
+    }, [(solution["total_time"], solution["moves"]) for solution in engine.solutions]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the chained and fused DFS expansion pipelines."
+    )
+    parser.add_argument("--trials", type=int, default=12)
+    parser.add_argument("--min-size", type=int, default=3)
+    parser.add_argument("--max-size", type=int, default=5)
+    parser.add_argument("--capacities", type=int, nargs="+", default=[2, 3])
+    parser.add_argument("--slowest", type=int, default=12)
+    parser.add_argument(
+        "--slack", type=float, default=4.0, help="minutes allowed above the optimum"
+    )
+    parser.add_argument("--lifecycle", action="store_true")
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    failures = 0
+    print(
+        f"{'':>4} {'trial':>5} {'n':>2} {'k':>2} {'pipeline':>8} {'expanded':>8} "
+        f"{'fired/node':>10} {'facts/node':>10} {'peak_wm':>8} {'seconds':>8}"
+    )
+    for trial in range(args.trials):
+        people = random_roster(
+            rng, rng.randint(args.min_size, args.max_size), args.slowest
+        )
+        capacity = rng.choice(args.capacities)
+        max_time = optimal_time([time for _, time in people]) + args.slack
+        chained, chained_solutions = measure(
+            people, max_time, capacity, False, args.lifecycle
+        )
+        fused, fused_solutions = measure(
+            people, max_time, capacity, True, args.lifecycle
+        )
+        ok = chained_solutions == fused_solutions
+        failures += not ok
+        for label, row in (("chained", chained), ("fused", fused)):
+            results.append(
+                {
+                    "trial": trial,
+                    "size": len(people),
+                    "capacity": capacity,
+                    "pipeline": label,
+                    "identical": ok,
+                    **row,
+                }
+            )
+            print(
+                f"{'ok' if ok else 'FAIL':>4} {trial:>5} {len(people):>2} "
+                f"{capacity:>2} {label:>8} {row['expanded']:>8} "
+                f"{row['fired_per_node']:>10} {row['declared_per_node']:>10} "
+                f"{row['peak_facts']:>8} {row['seconds']:>8}"
+            )
+
+    print(f"\n{failures} trial(s) with different solutions")
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch import STRATEGIES, build_solver
+from oracle import optimal_time
+from sampling import optimal_schedules, random_roster
+from search_log import SearchLog
+
+
+def what_if(rng, people, max_time, slowest):
+    if rng.random() < 0.3:
+        return people, max_time + rng.choice((-2.0, -1.0, 1.0, 2.0))
+    person = rng.randrange(len(people))
+    name, travel_time = people[person]
+    travel_time = float(min(slowest, max(1, travel_time + rng.choice((-2, -1, 1, 2)))))
+    return people[:person] + [(name, travel_time)] + people[person + 1 :], max_time
+
+
+def timed(solve, *args):
+    started = time.perf_counter()
+    solutions = solve(*args)
+    return solutions, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare incremental re-solves against solving from scratch "
+        "over a sequence of single-person and time-limit changes."
+    )
+    parser.add_argument("--strategy", choices=STRATEGIES, default="fast")
+    parser.add_argument("--mode", choices=("all", "optimal"), default="all")
+    parser.add_argument("--rosters", type=int, default=4)
+    parser.add_argument("--changes", type=int, default=10)
+    parser.add_argument("--size", type=int, default=6)
+    parser.add_argument("--capacity", type=int, default=2)
+    parser.add_argument("--slowest", type=int, default=12)
+    parser.add_argument(
+        "--slack", type=float, default=3.0, help="minutes allowed above the optimum"
+    )
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    mode = args.mode if args.strategy in ("dfs", "fast") else "all"
+    rng = random.Random(args.seed)
+    results = []
+    failures = 0
+    fresh_total = incremental_total = 0.0
+    for roster in range(args.rosters):
+        people = random_roster(rng, args.size, args.slowest)
+        max_time = optimal_time([time for _, time in people]) + args.slack
+        engine = build_solver(
+            args.strategy,
+            people,
+            max_time,
+            args.capacity,
+            log=SearchLog("off"),
+            mode=mode,
+        )
+        engine.solve()
+        for change in range(args.changes):
+            people, max_time = what_if(rng, people, max_time, args.slowest)
+            fresh = build_solver(
+                args.strategy,
+                people,
+                max_time,
+                args.capacity,
+                log=SearchLog("off"),
+                mode=mode,
+            )
+            expected, fresh_seconds = timed(fresh.solve)
+            found, seconds = timed(engine.resolve, people, max_time)
+            ok = optimal_schedules(found) == optimal_schedules(expected)
+            failures += not ok
+            fresh_total += fresh_seconds
+            incremental_total += seconds
+            stats = engine.resolve_stats
+            results.append(
+                {
+                    "roster": roster,
+                    "change": change,
+                    "changed": stats["changed"],
+                    "max_time": max_time,
+                    "identical_optimum": ok,
+                    "invalidated": stats["invalidated"],
+                    "kept": stats["kept"],
+                    "searched": stats["searched"],
+                    "expanded_fresh": fresh.visited.stats()["entries"],
+                    "solutions_fresh": len(expected),
+                    "solutions": len(found),
+                    "seconds_fresh": round(fresh_seconds, 6),
+                    "seconds": round(seconds, 6),
+                }
+            )
+            print(
+                f"{'ok' if ok else 'FAIL':>4} roster={roster} change={change:<2} "
+                f"{','.join(stats['changed']) or 'T':>4} T={max_time:<5} "
+                f"kept={stats['kept']:<5} invalidated={stats['invalidated']:<5} "
+                f"solutions={len(expected)}->{len(found)} "
+                f"{fresh_seconds:.4f}s->{seconds:.4f}s"
+            )
+
+    speedup = fresh_total / incremental_total if incremental_total else float("inf")
+    print(
+        f"\n{failures} change(s) with a different optimum; from scratch "
+        f"{fresh_total:.3f}s, incremental {incremental_total:.3f}s ({speedup:.1f}x)"
+    )
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch import STRATEGIES, _worker_caches, _worker_engines, solve_instance
+from oracle import optimal_time
+from solution_cache import canonical_people
+
+NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def workload(rng, rosters, instances, size, slowest, slack):
+    pool = []
+    for _ in range(rosters):
+        times = [float(rng.randint(1, slowest)) for _ in range(size)]
+        pool.append((times, optimal_time(times) + slack))
+    for _ in range(instances):
+        times, max_time = rng.choice(pool)
+        names = rng.sample(NAMES, size)
+        people = list(zip(names, times))
+        rng.shuffle(people)
+        yield {"people": people, "max_time": max_time}
+
+
+def comparable(result):
+    return result["best_time"], [
+        (solution["total_time"], solution["moves"]) for solution in result["solutions"]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a workload of recurring rosters with and without the "
+        "solution cache."
+    )
+    parser.add_argument("--strategy", choices=STRATEGIES, default="dfs")
+    parser.add_argument("--rosters", type=int, default=6)
+    parser.add_argument("--instances", type=int, default=40)
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--slowest", type=int, default=10)
+    parser.add_argument(
+        "--slack", type=float, default=2.0, help="minutes allowed above the optimum"
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=256, help="disk tier limit in KB"
+    )
+    parser.add_argument("--seed", type=int, default=2)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    instances = list(
+        workload(
+            random.Random(args.seed),
+            args.rosters,
+            args.instances,
+            args.size,
+            args.slowest,
+            args.slack,
+        )
+    )
+    failures = 0
+    tiers = {"memory": 0, "disk": 0, "miss": 0}
+    plain_total = cached_total = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "solutions.db")
+        for number, instance in enumerate(instances):
+            instance = {**instance, "people": canonical_people(instance["people"])}
+            _worker_engines.clear()
+            started = time.perf_counter()
+            expected = solve_instance(instance, args.strategy)
+            plain_total += time.perf_counter() - started
+            started = time.perf_counter()
+            found = solve_instance(
+                instance,
+                args.strategy,
+                cache=path,
+                cache_limit=args.cache_size << 10,
+            )
+            cached_total += time.perf_counter() - started
+            ok = comparable(found) == comparable(expected)
+            failures += not ok
+            tiers[found["cache"]] += 1
+            print(
+                f"{'ok' if ok else 'FAIL':>4} instance={number:<3} "
+                f"{found['cache']:>6} best={found['best_time']} "
+                f"solutions={len(found['solutions'])}"
+            )
+        stats = _worker_caches[path].stats()
+        _worker_caches.pop(path).close()
+
+    lookups = sum(tiers.values())
+    print(
+        f"\n{failures} mismatch(es); hit rate {(lookups - tiers['miss']) / lookups:.1%} "
+        f"(memory={tiers['memory']}, disk={tiers['disk']}, miss={tiers['miss']}); "
+        f"evicted {stats['memory_evictions']} from memory, "
+        f"{stats['disk_evictions']} from disk; without cache {plain_total:.3f}s, "
+        f"with cache {cached_total:.3f}s"
+    )
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"tiers": tiers, "cache": stats}, handle, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
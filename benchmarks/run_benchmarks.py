@@ -0,0 +1,227 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+DEFAULT_PEOPLE = [
+    ("You", 1),
+    ("Lab Assistant", 2),
+    ("Worker", 5),
+    ("Scientist", 10),
+]
+
+METRICS = (
+    "wall_time",
+    "rules_fired",
+    "facts_declared",
+    "facts_retracted",
+    "peak_facts",
+    "peak_rss_kb",
+)
+
+
+def generated_roster(size, seed, slowest=20):
+    rng = random.Random(seed * 1000 + size)
+    return [(f"P{index}", rng.randint(1, slowest)) for index in range(size)]
+
+
+def benchmark_cases(args):
+    for size in args.sizes:
+        people = generated_roster(size, args.seed)
+        for engine in args.engines:
+            yield {
+                "sweep": "roster_size",
+                "engine": engine,
+                "size": size,
+                "max_time": args.roster_max_time,
+                "capacity": args.capacity,
+                "profile": args.profile,
+                "lifecycle": args.lifecycle and engine == "dfs",
+                "people": people,
+            }
+    for max_time in args.max_times:
+        for engine in args.engines:
+            yield {
+                "sweep": "max_time",
+                "engine": engine,
+                "size": len(DEFAULT_PEOPLE),
+                "max_time": max_time,
+                "capacity": args.capacity,
+                "profile": args.profile,
+                "lifecycle": args.lifecycle and engine == "dfs",
+                "people": DEFAULT_PEOPLE,
+            }
+
+
+def _run_case(case, connection):
+    sys.path.insert(0, SRC)
+    from batch import solver_class, solver_options
+    from metrics import instrument
+    from profiler import profiled
+    from search_log import SearchLog
+
+    engine_class = instrument(solver_class(case["engine"]))
+    if case["profile"]:
+        engine_class = profiled(engine_class)
+    engine = engine_class(
+        case["people"],
+        case["max_time"],
+        case["capacity"],
+        log=SearchLog("off"),
+        **solver_options(case["engine"], lifecycle=case["lifecycle"]),
+    )
+    engine.reset()
+    engine.run()
+    result = engine.metrics.as_dict()
+    result["solutions"] = len(engine.solutions)
+    if case["profile"]:
+        result["profile"] = engine.profiler.as_dict()
+    result["best_time"] = min(
+        (solution["total_time"] for solution in engine.solutions), default=None
+    )
+    connection.send(result)
+    connection.close()
+
+
+def measure(case, timeout):
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(case, sender))
+    process.start()
+    sender.close()
+    result = {"error": "timeout"}
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = {"error": "crashed"}
+    process.join(1)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SRC,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_key(row):
+    return (
+        row["sweep"],
+        row["engine"],
+        row["size"],
+        row["max_time"],
+        row.get("capacity", 2),
+    )
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as handle:
+        baseline = {case_key(row): row for row in json.load(handle)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for row in results:
+        old = baseline.get(case_key(row))
+        if not old or "error" in old or "error" in row:
+            continue
+        ratios = " ".join(
+            f"{metric}={row[metric] / old[metric]:.2f}x"
+            for metric in ("wall_time", "rules_fired", "peak_facts")
+            if old[metric]
+        )
+        print(
+            f"  {row['sweep']:>11} {row['engine']:>5} n={row['size']:<3} "
+            f"T={row['max_time']:<6} {ratios}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure engine scaling by roster size and time limit."
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=("dfs", "bfs", "astar", "ucs"),
+        default=["dfs", "bfs"],
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4, 5, 6])
+    parser.add_argument("--roster-max-time", type=float, default=60.0)
+    parser.add_argument(
+        "--max-times", type=float, nargs="+", default=[15.0, 17.0, 21.0, 30.0]
+    )
+    parser.add_argument("--capacity", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument(
+        "--profile", action="store_true", help="store per-rule timings per case"
+    )
+    parser.add_argument(
+        "--lifecycle",
+        action="store_true",
+        help="retract consumed dfs facts (compare peak_wm with and without)",
+    )
+    parser.add_argument("--json", default="engine_scaling.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'sweep':>11} {'engine':>6} {'size':>4} {'max_time':>8} {'seconds':>9} "
+        f"{'fired':>8} {'declared':>9} {'retracted':>9} {'peak_wm':>8} {'rss_kb':>8}"
+    )
+    for case in benchmark_cases(args):
+        row = {
+            key: case[key]
+            for key in ("sweep", "engine", "size", "max_time", "capacity")
+        }
+        row.update(measure(case, args.timeout))
+        results.append(row)
+        if "error" in row:
+            print(
+                f"{row['sweep']:>11} {row['engine']:>6} {row['size']:>4} "
+                f"{row['max_time']:>8} {row['error']:>9}"
+            )
+            continue
+        print(
+            f"{row['sweep']:>11} {row['engine']:>6} {row['size']:>4} "
+            f"{row['max_time']:>8} {row['wall_time']:>9.3f} {row['rules_fired']:>8} "
+            f"{row['facts_declared']:>9} {row['facts_retracted']:>9} "
+            f"{row['peak_facts']:>8} {row['peak_rss_kb']:>8}"
+        )
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parameters": vars(args),
+        "metrics": list(METRICS),
+        "results": results,
+    }
+    with open(args.json, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nWrote {len(results)} results to {args.json}")
+
+    args.compare and compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from Bfs.engine_bfs import BridgePuzzleSolverBfs
+from oracle import optimal_time
+from sampling import optimal_schedules, random_roster
+from search_log import SearchLog
+
+
+def replay(people, capacity, max_time, solution):
+    times = dict(people)
+    left = set(times)
+    flashlight_left = True
+    total = 0.0
+    for action, names, time_taken in solution["moves"]:
+        side = left if flashlight_left else set(times) - left
+        if (action == "cross") != flashlight_left or not set(names) <= side:
+            return False
+        if action == "cross" and not (1 <= len(names) <= capacity):
+            return False
+        if action == "return" and len(names) != 1:
+            return False
+        if time_taken != max(times[name] for name in names):
+            return False
+        left = left - set(names) if flashlight_left else left | set(names)
+        flashlight_left = not flashlight_left
+        total += time_taken
+    return not left and total == solution["total_time"] <= max_time
+
+
+def run(people, max_time, capacity, symmetry, dominance, bidirectional):
+    engine = BridgePuzzleSolverBfs(
+        people,
+        max_time,
+        capacity,
+        symmetry,
+        dominance,
+        bidirectional,
+        log=SearchLog("off"),
+    )
+    started = time.perf_counter()
+    engine.solve()
+    return engine, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check bidirectional BFS against the forward-only search."
+    )
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--min-size", type=int, default=3)
+    parser.add_argument("--max-size", type=int, default=5)
+    parser.add_argument("--capacities", type=int, nargs="+", default=[2, 3])
+    parser.add_argument("--slowest", type=int, default=12)
+    parser.add_argument(
+        "--slack", type=float, default=3.0, help="minutes allowed above the optimum"
+    )
+    parser.add_argument(
+        "--loose", type=float, default=100.0, help="a limit far above the optimum"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    forward_total = bidirectional_total = 0
+    forward_seconds = bidirectional_seconds = 0.0
+    for trial in range(args.trials):
+        people = random_roster(
+            rng, rng.randint(args.min_size, args.max_size), args.slowest
+        )
+        capacity = rng.choice(args.capacities)
+        symmetry = rng.random() < 0.3
+        dominance = rng.random() < 0.3
+        max_time = optimal_time([time for _, time in people]) + rng.choice(
+            (-1.0, 0.0, args.slack, args.loose)
+        )
+        forward, seconds = run(people, max_time, capacity, symmetry, dominance, False)
+        both, both_seconds = run(people, max_time, capacity, symmetry, dominance, True)
+        valid = all(
+            replay(people, capacity, max_time, solution) for solution in both.solutions
+        )
+        ok = valid and optimal_schedules(both.solutions) == optimal_schedules(
+            forward.solutions
+        )
+        failures += not ok
+        expanded = forward.expanded["forward"]
+        both_expanded = both.expanded["forward"] + both.expanded["backward"]
+        forward_total += expanded
+        bidirectional_total += both_expanded
+        forward_seconds += seconds
+        bidirectional_seconds += both_seconds
+        print(
+            f"{'ok' if ok else 'FAIL':>4} trial={trial:<3} n={len(people)} "
+            f"k={capacity} T={max_time:<5} sym={symmetry:d} dom={dominance:d} "
+            f"solutions={len(forward.solutions)}/{len(both.solutions)} "
+            f"expanded={expanded}->{both_expanded} "
+            f"({both.expanded['forward']}+{both.expanded['backward']}) "
+            f"{seconds:.3f}s->{both_seconds:.3f}s"
+        )
+
+    print(
+        f"\n{failures} failure(s); expanded {forward_total} -> {bidirectional_total} "
+        f"states, {forward_seconds:.3f}s -> {bidirectional_seconds:.3f}s"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
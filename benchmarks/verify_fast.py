@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch import build_solver
+from oracle import optimal_time
+from sampling import random_roster
+from search_log import SearchLog
+
+PAIRS = (
+    ("dfs", "depth", "all"),
+    ("dfs", "depth", "optimal"),
+    ("dfs", "depth", "first"),
+    ("dfs", "depth", "best"),
+    ("bfs", "breadth", "all"),
+)
+
+
+def run(strategy, people, max_time, capacity, symmetry, dominance, mode, agenda):
+    engine = build_solver(
+        strategy,
+        people,
+        max_time,
+        capacity,
+        symmetry,
+        dominance,
+        SearchLog("off"),
+        mode,
+        agenda=agenda,
+    )
+    started = time.perf_counter()
+    engine.solve()
+    seconds = time.perf_counter() - started
+    return engine.solutions, engine.visited.stats(), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the fast solver against the rule engines."
+    )
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--min-size", type=int, default=2)
+    parser.add_argument("--max-size", type=int, default=5)
+    parser.add_argument("--capacities", type=int, nargs="+", default=[2, 3])
+    parser.add_argument("--slowest", type=int, default=12)
+    parser.add_argument(
+        "--slack", type=float, default=4.0, help="minutes allowed above the optimum"
+    )
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    engine_total = fast_total = 0.0
+    for trial in range(args.trials):
+        people = random_roster(
+            rng, rng.randint(args.min_size, args.max_size), args.slowest
+        )
+        capacity = rng.choice(args.capacities)
+        symmetry = rng.random() < 0.3
+        dominance = rng.random() < 0.3
+        max_time = optimal_time([time for _, time in people]) + rng.choice(
+            (-1.0, 0.0, args.slack)
+        )
+        for strategy, agenda, mode in PAIRS:
+            expected, expected_stats, seconds = run(
+                strategy, people, max_time, capacity, symmetry, dominance, mode, None
+            )
+            found, stats, fast_seconds = run(
+                "fast", people, max_time, capacity, symmetry, dominance, mode, agenda
+            )
+            ok = found == expected and stats == expected_stats
+            failures += not ok
+            engine_total += seconds
+            fast_total += fast_seconds
+            print(
+                f"{'ok' if ok else 'FAIL':>4} trial={trial:<3} {strategy:>3}/{mode:<7} "
+                f"n={len(people)} k={capacity} T={max_time:<5} "
+                f"sym={symmetry:d} dom={dominance:d} solutions={len(expected)} "
+                f"{seconds:.4f}s->{fast_seconds:.4f}s"
+            )
+
+    speedup = engine_total / fast_total if fast_total else float("inf")
+    print(
+        f"\n{failures} failure(s); engines {engine_total:.3f}s, fast "
+        f"{fast_total:.3f}s ({speedup:.0f}x)"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+from Astar.engine_moves_astar import BridgePuzzleSolverMovesAstar
+from Astar.engine_constraints_astar import BridgePuzzleSolverConstraintsAstar
+
+
+class BridgePuzzleSolverAstar(
+    BridgePuzzleSolverMovesAstar, BridgePuzzleSolverConstraintsAstar
+):
+    def print_final_summary(self):
+        self.log.summary(f"\n{'='*80}")
+        self.log.summary(f"FINAL SUMMARY: {len(self.solutions)} SOLUTION(S) FOUND")
+        self.log.summary("=" * 80)
+
+        if self.solutions:
+            self._print_solutions()
+        else:
+            self._print_no_solutions()
+
+        stats = self.visited.stats()
+        self.log.summary(f"Expanded states: {self.expanded_count}")
+        self.log.summary(
+            f"Visited table: {stats['entries']} entries, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['updates']} updates"
+        )
+        self.log.summary(self.checker.summary())
+        self.log.summary("=" * 80)
+        self.log.flush()
+
+    def _print_solutions(self):
+        for i, sol in enumerate(self.solutions, 1):
+            self.log.summary(f"\nSolution {i}: {sol['total_time']} minutes")
+            for j, (action, people, time_taken) in enumerate(sol["moves"], 1):
+                verb = "cross" if action == "cross" else "returns"
+                self.log.summary(
+                    f"  Step {j}: {' and '.join(people)} {verb} → {time_taken} min"
+                )
+
+    def _print_no_solutions(self):
+        self.log.summary("No solutions found within the time limit.")
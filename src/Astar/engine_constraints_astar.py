@@ -0,0 +1,93 @@
+from facts import *
+from search_log import *
+from experta import *
+import collections
+import collections.abc
+
+collections.Mapping = collections.abc.Mapping
+
+
+class BridgePuzzleSolverConstraintsAstar(KnowledgeEngine):
+    def record_solution(self, state):
+        elapsed_time = state["elapsed_time"]
+        moves = state["path"].moves()
+        self.best_total_time = elapsed_time
+        self.solution_count += 1
+        self.solutions.append(
+            {
+                "moves": self.roster.decode_path(moves),
+                "total_time": elapsed_time,
+                "solution_number": self.solution_count,
+            }
+        )
+        self.declare(
+            Solution(
+                moves=moves, total_time=elapsed_time, solution_id=self.solution_count
+            )
+        )
+
+    @Rule(
+        AS.solution
+        << Solution(
+            moves=MATCH.moves,
+            total_time=MATCH.total_time,
+            solution_id=MATCH.solution_id,
+        ),
+        NOT(SolutionPrinted(solution_id=MATCH.solution_id)),
+        salience=1,
+    )
+    def print_solution(self, moves, total_time, solution_id):
+        paint = self.log.paint
+        self.log.solution(
+            "=" * 60,
+            paint(
+                BOLD,
+                f"SOLUTION {solution_id} FOUND (Total time: {total_time} minutes):",
+            ),
+            "=" * 60,
+        )
+        for i, move in enumerate(moves, 1):
+            action, people, time_taken = self.roster.decode_move(move)
+
+            action_handlers = {
+                "cross": lambda: self.handle_cross_action(i, people, time_taken),
+                "return": lambda: self.handle_return_action(i, people, time_taken),
+            }
+            action_handlers.get(action, lambda: None)()
+
+        self.log.solution(
+            "-" * 60,
+            paint(
+                GREEN,
+                f"SUCCESS: All {len(self.roster)} people crossed in {total_time} minutes!",
+            ),
+            "=" * 60,
+            "",
+        )
+        self.declare(SolutionPrinted(solution_id=solution_id))
+
+    def handle_cross_action(self, step, people, time_taken):
+        paint = self.log.paint
+        label = paint(RED, f"Step {step}:")
+        minutes = paint(BLUE, f"{time_taken} minutes")
+        people_count = len(people)
+        cross_handlers = {
+            2: lambda: self.log.solution(
+                f"{label} {people[0]} and {people[1]} cross together ⨠ {minutes}"
+            ),
+            1: lambda: self.log.solution(
+                f"{label} {people[0]} crosses alone ⨠ {minutes}"
+            ),
+        }
+
+        def default_handler():
+            return self.log.solution(
+                f"{label} {', '.join(people)} cross together ⨠ {minutes}"
+            )
+
+        cross_handlers.get(people_count, default_handler)()
+
+    def handle_return_action(self, step, people, time_taken):
+        label = self.log.paint(RED, f"Step {step}:")
+        minutes = self.log.paint(BLUE, f"{time_taken} minutes")
+        self.log.solution(f"{label} {people[0]} returns with flashlight ⨠ {minutes}")
@@ -0,0 +1,218 @@
+from facts import *
+from search_log import *
+from roster import Roster
+from transposition import TranspositionTable
+from incremental import IncrementalMixin
+from path_node import PathNode
+from bounds import remaining_time_lower_bound
+from oracle import time_lower_bound
+from constraints import ConstraintChecker
+from agenda_order import CheapestFirstStrategy
+from experta import *
+import collections
+import collections.abc
+
+collections.Mapping = collections.abc.Mapping
+
+
+class BridgePuzzleSolverMovesAstar(IncrementalMixin, KnowledgeEngine):
+    def __init__(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        heuristic=True,
+        log=None,
+    ):
+        super().__init__()
+        self.strategy = CheapestFirstStrategy(cost=self.estimate_total)
+        self.log = log if log is not None else SearchLog()
+        self.heuristic = heuristic
+        self.visited = TranspositionTable()
+        self.sequence_counter = 0
+        self.expanded_count = 0
+        self.best_total_time = None
+        self.configure(people, max_time, capacity, symmetry, dominance)
+
+    def configure(
+        self, people, max_time=17, capacity=2, symmetry=False, dominance=False
+    ):
+        if capacity < 1:
+            raise ValueError("bridge capacity must be at least 1")
+        self.people = {name: float(time) for name, time in people}
+        self.roster = Roster(people, symmetry, dominance)
+        self.visited.clear()
+        self.max_time = float(max_time)
+        self.capacity = capacity
+        self.solutions = []
+        self.solution_count = 0
+
+    def finds_optimal_only(self):
+        return True
+
+    def solve(self, max_time=None):
+        if max_time is not None:
+            self.max_time = float(max_time)
+        self.solutions = []
+        self.solution_count = 0
+        self.reset()
+        self.run()
+        return self.solutions
+
+    @Rule()
+    def initialize(self):
+        if self.warm_visited:
+            self.visited.reset_stats()
+        else:
+            self.visited.clear()
+        self.sequence_counter = 0
+        self.expanded_count = 0
+        self.best_total_time = None
+        self.checker = ConstraintChecker(self.max_time, self.capacity)
+        needed = time_lower_bound(self.roster, self.capacity)
+        if needed > self.max_time:
+            self.log.summary(
+                f"No schedule fits in {self.max_time} minutes "
+                f"(the fastest schedule takes at least {needed})."
+            )
+            return
+        self.declare(TimeConstraint(max_time=self.max_time))
+        self.declare(
+            State(
+                left=self.roster.full_mask,
+                right=0,
+                flashlight_location=LEFT,
+                elapsed_time=0.0,
+                path=None,
+                depth=0,
+                sequence=self.sequence_counter,
+            )
+        )
+
+    def run(self, steps=float("inf")):
+        super().run(steps)
+        self.log.flush()
+
+    def estimate_remaining(self, left, flashlight_location):
+        if not self.heuristic:
+            return 0.0
+        return remaining_time_lower_bound(
+            self.roster, left, flashlight_location, self.capacity
+        )
+
+    def estimate_total(self, state):
+        return state["elapsed_time"] + self.estimate_remaining(
+            state["left"], state["flashlight_location"]
+        )
+
+    @Rule(
+        AS.state
+        << State(
+            left=MATCH.left,
+            flashlight_location=MATCH.flashlight_location,
+            elapsed_time=MATCH.elapsed_time,
+        ),
+        TimeConstraint(max_time=MATCH.max_time),
+        salience=5,
+    )
+    def enqueue_state(self, state, left, flashlight_location, elapsed_time, max_time):
+        estimate = elapsed_time + self.estimate_remaining(left, flashlight_location)
+        if estimate > max_time or not self.visited.admit(
+            left, flashlight_location, elapsed_time, state["path"]
+        ):
+            self.retract(state)
+
+    @Rule(
+        AS.state
+        << State(
+            left=MATCH.left,
+            right=MATCH.right,
+            flashlight_location=MATCH.flashlight_location,
+            elapsed_time=MATCH.elapsed_time,
+        ),
+        salience=-10,
+    )
+    def expand_best_state(self, state, left, right, flashlight_location, elapsed_time):
+        if self.visited.is_stale(left, flashlight_location, elapsed_time):
+            self.retract(state)
+            return
+        estimate = self.estimate_total(state)
+        if self.best_total_time is not None and estimate > self.best_total_time:
+            self.halt()
+            return
+
+        self.expanded_count += 1
+        if left == 0 and flashlight_location == RIGHT:
+            self.record_solution(state)
+        elif flashlight_location == LEFT:
+            self.log_expansion(state)
+            self.generate_cross_moves(state, left, right)
+        else:
+            self.log_expansion(state)
+            self.generate_return_moves(state, left, right)
+        self.retract(state)
+
+    def generate_cross_moves(self, state, left, right):
+        budget = self.max_time - state["elapsed_time"]
+        for group, crossing_time in self.roster.crossing_groups(
+            left, self.capacity, budget
+        ):
+            self._declare_successor(
+                state,
+                left & ~group,
+                right | group,
+                RIGHT,
+                ("cross", group, crossing_time),
+            )
+
+    def generate_return_moves(self, state, left, right):
+        times = self.roster.times
+        for person in self.roster.return_candidates(right):
+            group = 1 << person
+            self._declare_successor(
+                state,
+                left | group,
+                right & ~group,
+                LEFT,
+                ("return", group, times[person]),
+            )
+
+    def _declare_successor(self, state, left, right, flashlight_location, move):
+        elapsed_time = state["elapsed_time"] + move[2]
+        if not self.checker.accepts(
+            left, right, flashlight_location, elapsed_time, move
+        ):
+            return
+        self.sequence_counter += 1
+        self.declare(
+            State(
+                left=left,
+                right=right,
+                flashlight_location=flashlight_location,
+                elapsed_time=elapsed_time,
+                path=PathNode(state["path"], move),
+                depth=state["depth"] + 1,
+                sequence=self.sequence_counter,
+            )
+        )
+
+    def log_expansion(self, state):
+        if state["path"] is None or not self.log.sample_node():
+            return
+        paint = self.log.paint
+        action, people, time_taken = self.roster.decode_move(state["path"].move)
+        estimate = self.estimate_total(state)
+        left = paint(RED, f"⬅️  Left: {self.roster.names_of(state['left'])}")
+        right = paint(BLUE, f"➡️  Right: {self.roster.names_of(state['right'])}")
+        flashlight = paint(
+            YELLOW, f"🔦  Flashlight: {SIDE_NAMES[state['flashlight_location']]}"
+        )
+        clock = paint(GREEN, f"⏱️  Time: {state['elapsed_time']}")
+        self.log.node(
+            f"⟬A* Expansion {self.expanded_count} (depth:{state['depth']} f:{estimate})⟭ {action}: {', '.join(people)}",
+            f"{left}   {right}",
+            f"{flashlight}   {clock}",
+            "",
+        )
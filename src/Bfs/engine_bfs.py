@@ -6,33 +6,48 @@ class BridgePuzzleSolverBfs(
     BridgePuzzleSolverMovesBfs, BridgePuzzleSolverConstraintsBfs
 ):
     def print_final_summary(self):
-        print(f"\n{'='*80}")
-        print(f"FINAL SUMMARY: {len(self.solutions)} SOLUTION(S) FOUND")
-        print("=" * 80)
+        self.log.summary(f"\n{'='*80}")
+        self.log.summary(f"FINAL SUMMARY: {len(self.solutions)} SOLUTION(S) FOUND")
+        self.log.summary("=" * 80)
 
-        self.solutions and self._print_solutions() or self._print_no_solutions()
+        if self.solutions:
+            self._print_solutions()
+        else:
+            self._print_no_solutions()
 
-        print("=" * 80)
+        stats = self.visited.stats()
+        self.log.summary(
+            f"Visited table: {stats['entries']} entries, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['updates']} updates"
+        )
+        self.log.summary(self.checker.summary())
+        self.bidirectional and self.log.summary(
+            f"Bidirectional search: {self.expanded['forward']} forward and "
+            f"{self.expanded['backward']} backward expansions, "
+            f"{len(self.meeting)} meeting states"
+        )
+        self.log.summary("=" * 80)
+        self.log.flush()
 
     def _print_solutions(self):
         for i, sol in enumerate(self.solutions, 1):
-            print(f"\nSolution {i}: {sol['total_time']} minutes")
+            self.log.summary(f"\nSolution {i}: {sol['total_time']} minutes")
             for j, (action, people, time_taken) in enumerate(sol["moves"], 1):
                 action_handlers = {
-                    "cross": lambda: print(
-                        f"  Step {j}: {people[0]} and {people[1]} cross → {time_taken} min"
+                    "cross": lambda: self.log.summary(
+                        f"  Step {j}: {' and '.join(people)} cross → {time_taken} min"
                     ),
-                    "return": lambda: print(
+                    "return": lambda: self.log.summary(
                         f"  Step {j}: {people[0]} returns → {time_taken} min"
                     ),
                 }
                 handler = action_handlers.get(
                     action,
-                    lambda: print(
+                    lambda: self.log.summary(
                         f"  Step {j}: {people[0]} returns → {time_taken} min"
                     ),
                 )
                 handler()
 
     def _print_no_solutions(self):
-        print("No solutions found within the time limit.")
+        self.log.summary("No solutions found within the time limit.")
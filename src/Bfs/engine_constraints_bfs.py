@@ -1,4 +1,6 @@
 from facts import *
+from search_log import *
+from state_buckets import StateBuckets
 from experta import *
 import collections
 import collections.abc
@@ -10,6 +12,7 @@ class BridgePuzzleSolverConstraintsBfs(KnowledgeEngine):
     def __init__(self):
         super().__init__()
         self.solution_signatures = set()
+        self.state_buckets = StateBuckets()
 
     @Rule(
         AS.retraction_request
@@ -37,203 +40,33 @@ class BridgePuzzleSolverConstraintsBfs(KnowledgeEngine):
         AS.state
         << State(
             left=MATCH.left,
-            right=MATCH.right,
             flashlight_location=MATCH.flashlight_location,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        TimeConstraint(max_time=MATCH.max_time),
-        TEST(lambda elapsed_time, max_time: elapsed_time > max_time),
-        salience=10,
-    )
-    def time_limit_passing(self, state):
-        self.retract(state)
-
-    @Rule(
-        AS.state1
-        << State(
-            left=MATCH.left1,
-            right=MATCH.right1,
-            flashlight_location=MATCH.flashlight_location1,
-            elapsed_time=MATCH.elapsed_time1,
-            path=MATCH.path1,
-            depth=MATCH.depth1,
-            sequence=MATCH.sequence1,
-        ),
-        AS.state2
-        << State(
-            left=MATCH.left2,
-            right=MATCH.right2,
-            flashlight_location=MATCH.flashlight_location2,
-            elapsed_time=MATCH.elapsed_time2,
-            path=MATCH.path2,
-            depth=MATCH.depth2,
-            sequence=MATCH.sequence2,
-        ),
-        TEST(lambda state1, state2: state1 != state2),
-        TEST(
-            lambda left1, right1, flashlight_location1, left2, right2, flashlight_location2, elapsed_time1, elapsed_time2: left1
-            == left2
-            and right1 == right2
-            and flashlight_location1 == flashlight_location2
-            and elapsed_time1 >= elapsed_time2
         ),
         salience=9,
     )
-    def retract_duplicate_state(self, state1):
-        self.retract(state1)
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        TEST(
-            lambda left, right, flashlight_location: (
-                flashlight_location == "left" and not left
+    def retract_duplicate_state(self, state, elapsed_time, path):
+        rivals = self.state_buckets.live(self.facts, state)
+        if any(
+            elapsed_time > other["elapsed_time"]
+            or (
+                elapsed_time == other["elapsed_time"] and path.duplicates(other["path"])
             )
-            or (flashlight_location == "right" and not right)
-        ),
-        salience=8,
-    )
-    def flashlight_constraint(self, state):
-        self.retract(state)
+            for other in rivals
+        ):
+            self.retract(state)
+            return
+        for other in rivals:
+            (other["elapsed_time"] > elapsed_time) and self.retract(other)
+        self.state_buckets.add(state)
 
     @Rule(
         AS.state
         << State(
             left=MATCH.left,
             right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        TEST(lambda path: path and path[-1][0] == "cross" and len(path[-1][1]) > 2),
-        salience=8,
-    )
-    def bridge_capacity_violation(self, state, path):
-        last_move = path[-1]
-        self.retract(state)
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        TEST(
-            lambda path: path
-            and (
-                (path[-1][0] == "cross" and len(path[-1][1]) < 2)
-                or (path[-1][0] == "return" and len(path[-1][1]) != 1)
-            )
-        ),
-        salience=8,
-    )
-    def invalid_move_pattern(self, state, path):
-        last_move = path[-1]
-        self.retract(state)
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        TEST(
-            lambda path, flashlight_location: path
-            and (
-                (path[-1][0] == "cross" and flashlight_location != "right")
-                or (path[-1][0] == "return" and flashlight_location != "left")
-            )
-        ),
-        salience=8,
-    )
-    def invalid_flashlight_location(self, state, path):
-        last_move = path[-1]
-        self.retract(state)
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        VisitedState(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            best_time=MATCH.best_time,
-        ),
-        TEST(lambda elapsed_time, best_time: elapsed_time > best_time),
-        salience=11,
-    )
-    def cut_worse_path(self, state):
-        self.retract(state)
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        AS.visited
-        << VisitedState(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            best_time=MATCH.best_time,
-        ),
-        TEST(lambda elapsed_time, best_time: elapsed_time <= best_time),
-        salience=12,
-    )
-    def update_best_time(self, visited, left, right, flashlight_location, elapsed_time):
-        (visited in self.facts) and self.retract(visited)
-        self.declare(
-            VisitedState(
-                left=left,
-                right=right,
-                flashlight_location=flashlight_location,
-                best_time=elapsed_time,
-            )
-        )
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location="right",
+            flashlight_location=RIGHT,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
             depth=MATCH.depth,
@@ -241,32 +74,35 @@ class BridgePuzzleSolverConstraintsBfs(KnowledgeEngine):
         ),
         TimeConstraint(max_time=MATCH.max_time),
         TEST(lambda left: not left),
-        TEST(lambda right: len(right) == 4),
         TEST(lambda elapsed_time, max_time: elapsed_time <= max_time),
-        NOT(Solution(moves=MATCH.path, total_time=MATCH.elapsed_time)),
-        TEST(lambda path: path is not None and len(path) > 0),
+        TEST(lambda path: path is not None),
         salience=5,
     )
     def goal_reached(self, state, elapsed_time, path):
-        solution_signature = tuple(
-            (action, tuple(people), time_taken) for action, people, time_taken in path
-        )
+        if not self.record_solution(path.moves(), elapsed_time):
+            return
+        (state in self.facts) and self.retract(state)
+
+    def record_solution(self, moves, total_time):
+        solution_signature = tuple(moves)
+        if solution_signature in self.solution_signatures:
+            return False
 
         self.solution_signatures.add(solution_signature)
         self.solution_count += 1
         self.solutions.append(
             {
-                "moves": list(path),
-                "total_time": elapsed_time,
+                "moves": self.roster.decode_path(moves),
+                "total_time": total_time,
                 "solution_number": self.solution_count,
             }
         )
         self.declare(
             Solution(
-                moves=path, total_time=elapsed_time, solution_id=self.solution_count
+                moves=moves, total_time=total_time, solution_id=self.solution_count
             )
         )
-        (state in self.facts) and self.retract(state)
+        return True
 
     @Rule(
         AS.solution
@@ -279,42 +115,57 @@ class BridgePuzzleSolverConstraintsBfs(KnowledgeEngine):
         salience=1,
     )
     def print_solution(self, moves, total_time, solution_id):
-        print(f"{'='*60}")
-        print(
-            f"\033[1mSOLUTION {solution_id} FOUND (Total time: {total_time} minutes):\033[0m"
+        paint = self.log.paint
+        self.log.solution(
+            "=" * 60,
+            paint(
+                BOLD,
+                f"SOLUTION {solution_id} FOUND (Total time: {total_time} minutes):",
+            ),
+            "=" * 60,
         )
-        print("=" * 60)
         for i, move in enumerate(moves, 1):
-            action, people, time_taken = move
+            action, people, time_taken = self.roster.decode_move(move)
+
             action_handlers = {
                 "cross": lambda: self.handle_cross_action(i, people, time_taken),
                 "return": lambda: self.handle_return_action(i, people, time_taken),
             }
             action_handlers.get(action, lambda: None)()
 
-        print("-" * 60)
-        print(f"\033[32mSUCCESS: All 4 people crossed in {total_time} minutes!\033[0m")
-        print("=" * 60)
-        print("")
+        self.log.solution(
+            "-" * 60,
+            paint(
+                GREEN,
+                f"SUCCESS: All {len(self.roster)} people crossed in {total_time} minutes!",
+            ),
+            "=" * 60,
+            "",
+        )
         self.declare(SolutionPrinted(solution_id=solution_id))
 
     def handle_cross_action(self, step, people, time_taken):
-        actions = {
-            2: lambda: print(
-                f"\033[31mStep {step}:\033[0m {people[0]} and {people[1]} cross together ⨠ \033[34m{time_taken} minutes\033[0m"
+        paint = self.log.paint
+        label = paint(RED, f"Step {step}:")
+        minutes = paint(BLUE, f"{time_taken} minutes")
+        people_count = len(people)
+        cross_handlers = {
+            2: lambda: self.log.solution(
+                f"{label} {people[0]} and {people[1]} cross together ⨠ {minutes}"
             ),
-            1: lambda: print(
-                f"\033[31mStep {step}:\033[0m {people[0]} crosses alone ⨠ \033[34m{time_taken} minutes\033[0m"
+            1: lambda: self.log.solution(
+                f"{label} {people[0]} crosses alone ⨠ {minutes}"
             ),
         }
-        actions.get(
-            len(people),
-            lambda: print(
-                f"\033[31mStep {step}:\033[0m {', '.join(people)} cross together ⨠ \033[34m{time_taken} minutes\033[0m"
-            ),
-        )()
+
+        def default_handler():
+            return self.log.solution(
+                f"{label} {', '.join(people)} cross together ⨠ {minutes}"
+            )
+
+        cross_handlers.get(people_count, default_handler)()
 
     def handle_return_action(self, step, people, time_taken):
-        print(
-            f"\033[31mStep {step}:\033[0m {people[0]} returns with flashlight ⨠ \033[34m{time_taken} minutes\033[0m"
-        )
+        label = self.log.paint(RED, f"Step {step}:")
+        minutes = self.log.paint(BLUE, f"{time_taken} minutes")
+        self.log.solution(f"{label} {people[0]} returns with flashlight ⨠ {minutes}")
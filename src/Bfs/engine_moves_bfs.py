@@ -1,95 +1,164 @@
 from facts import *
+from search_log import *
+from roster import Roster
+from transposition import TranspositionTable
+from incremental import IncrementalMixin
+from path_node import PathNode
+from bounds import remaining_time_lower_bound
+from agenda_order import agenda_strategy
+from oracle import time_lower_bound, time_upper_bound
+from constraints import ConstraintChecker
 from experta import *
+from itertools import combinations
 import collections
 import collections.abc
 
 collections.Mapping = collections.abc.Mapping
 
 
-class BridgePuzzleSolverMovesBfs(KnowledgeEngine):
-    def __init__(self, people, max_time=17):
+class BridgePuzzleSolverMovesBfs(IncrementalMixin, KnowledgeEngine):
+    def __init__(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        bidirectional=False,
+        log=None,
+        agenda="breadth",
+    ):
         super().__init__()
+        self.strategy = agenda_strategy(agenda)
+        self.log = log if log is not None else SearchLog()
+        self.visited = TranspositionTable()
+        self.goal_visited = TranspositionTable()
+        self.meeting = {}
+        self.goal_halves = {}
+        self.forward_groups = {}
+        self.expanded = collections.Counter()
+        self.processing_depth = 0
+        self.sequence_counter = 0
+        self.configure(people, max_time, capacity, symmetry, dominance, bidirectional)
+
+    def configure(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        bidirectional=False,
+    ):
+        if capacity < 1:
+            raise ValueError("bridge capacity must be at least 1")
+        self.bidirectional = bidirectional
         self.people = {name: float(time) for name, time in people}
+        self.roster = Roster(people, symmetry, dominance)
+        self.visited.clear()
         self.max_time = float(max_time)
+        self.capacity = capacity
         self.solutions = []
         self.solution_count = 0
-        self.sequence_counter = 0
+        self.solution_signatures.clear()
+
+    def solve(self, max_time=None):
+        if max_time is not None:
+            self.max_time = float(max_time)
+        self.solutions = []
+        self.solution_count = 0
+        self.solution_signatures.clear()
+        self.reset()
+        self.run()
+        return self.solutions
 
     @Rule()
     def initialize(self):
-        left_side = list(self.people.keys())
         self.sequence_counter += 1
+        if self.warm_visited:
+            self.visited.reset_stats()
+        else:
+            self.visited.clear()
+        self.goal_visited.clear()
+        self.meeting.clear()
+        self.goal_halves.clear()
+        self.forward_groups.clear()
+        self.expanded.clear()
+        self.state_buckets.clear()
+        self.checker = ConstraintChecker(self.max_time, self.capacity)
+        self.midpoint = float("inf")
+        if self.bidirectional:
+            upper = min(self.max_time, time_upper_bound(self.roster, self.capacity))
+            self.midpoint = upper / 2
+        self.processing_depth = 0
 
         facts_to_retract = filter(
-            lambda fact: isinstance(
-                fact, (State, VisitedState, ActiveState, ProcessedState, BFSQueue)
-            ),
-            list(self.facts),
+            lambda fact: isinstance(fact, State), list(self.facts.values())
         )
         for fact in facts_to_retract:
             self.retract(fact)
+        needed = time_lower_bound(self.roster, self.capacity)
+        if needed > self.max_time:
+            self.log.summary(
+                f"No schedule fits in {self.max_time} minutes "
+                f"(the fastest schedule takes at least {needed})."
+            )
+            return
 
         self.declare(
             State(
-                left=left_side,
-                right=[],
-                flashlight_location="left",
+                left=self.roster.full_mask,
+                right=0,
+                flashlight_location=LEFT,
                 elapsed_time=0.0,
-                path=[],
+                path=None,
                 depth=0,
                 sequence=self.sequence_counter,
             )
         )
-        self.declare(TimeConstraint(max_time=17.0))
-        self.declare(BFSQueue(current_depth=0, processing_depth=0))
+        self.declare(TimeConstraint(max_time=self.max_time))
+        self.declare(BridgeCapacity(capacity=self.capacity))
+        if self.bidirectional:
+            self.declare(
+                BackwardState(
+                    left=0,
+                    right=self.roster.full_mask,
+                    flashlight_location=RIGHT,
+                    remaining_time=0.0,
+                    path=None,
+                    depth=0,
+                    sequence=self.sequence_counter,
+                )
+            )
+            self.declare(MeetInTheMiddle())
+
+    def run(self, steps=float("inf")):
+        super().run(steps)
+        self.log.flush()
 
     @Rule(
         AS.state
         << State(
             left=MATCH.left,
-            right=MATCH.right,
             flashlight_location=MATCH.flashlight_location,
             elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        OR(
-            NOT(
-                VisitedState(
-                    left=MATCH.left,
-                    right=MATCH.right,
-                    flashlight_location=MATCH.flashlight_location,
-                )
-            ),
-            AND(
-                VisitedState(
-                    left=MATCH.left,
-                    right=MATCH.right,
-                    flashlight_location=MATCH.flashlight_location,
-                    best_time=MATCH.best_time,
-                ),
-                TEST(
-                    lambda elapsed_time, best_time: best_time is None
-                    or elapsed_time <= best_time
-                ),
-            ),
         ),
         TimeConstraint(max_time=MATCH.max_time),
         TEST(lambda elapsed_time, max_time: elapsed_time <= max_time),
+        salience=7,
     )
-    def mark_unvisited_state(
-        self, state, left, right, flashlight_location, elapsed_time
-    ):
-        self.declare(
-            VisitedState(
-                left=left,
-                right=right,
-                flashlight_location=flashlight_location,
-                best_time=elapsed_time,
-            )
+    def admit_state(self, state, left, flashlight_location, elapsed_time):
+        if not self.visited.admit(
+            left, flashlight_location, elapsed_time, state["path"]
+        ):
+            self.retract(state)
+            return
+        if elapsed_time >= self.midpoint and left:
+            key = self.visited.key(left, flashlight_location)
+            self.meeting.setdefault(key, []).append((elapsed_time, state["path"]))
+        state["depth"] > 0 and self.log.sample_node() and self.log_search_progress(
+            state
         )
-        self.declare(ActiveState(state_ref=state))
 
     @Rule(
         AS.state
@@ -98,164 +167,62 @@ class BridgePuzzleSolverMovesBfs(KnowledgeEngine):
             right=MATCH.right,
             flashlight_location=MATCH.flashlight_location,
             elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
             depth=MATCH.depth,
-            sequence=MATCH.sequence,
         ),
-        AS.visited
-        << VisitedState(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            best_time=MATCH.best_time,
-        ),
-        TEST(lambda elapsed_time, best_time: elapsed_time < best_time),
+        TimeConstraint(max_time=MATCH.max_time),
+        BridgeCapacity(capacity=MATCH.capacity),
+        salience=-10,
     )
-    def update_better_path(
-        self, state, visited, left, right, flashlight_location, elapsed_time
+    def expand_state(
+        self,
+        state,
+        left,
+        right,
+        flashlight_location,
+        elapsed_time,
+        depth,
+        max_time,
+        capacity,
     ):
-        self.retract(visited)
-        self.declare(
-            VisitedState(
-                left=left,
-                right=right,
-                flashlight_location=flashlight_location,
-                best_time=elapsed_time,
+        if elapsed_time >= self.midpoint:
+            return
+        if self.visited.is_stale(left, flashlight_location, elapsed_time):
+            return
+        self.expanded["forward"] += 1
+        if depth > self.processing_depth:
+            self.processing_depth = depth
+            self.log.summary(
+                self.log.paint(BOLD, f"⚙️  BFS: Advancing to process depth {depth}"),
+                "",
             )
-        )
-        self.declare(ActiveState(state_ref=state))
-
-    @Rule(
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        VisitedState(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location=MATCH.flashlight_location,
-            best_time=MATCH.best_time,
-        ),
-        TEST(lambda elapsed_time, best_time: elapsed_time > best_time),
-    )
-    def cut_worse_path(self, state):
-        self.retract(state)
-
-    @Rule(
-        AS.queue
-        << BFSQueue(
-            current_depth=MATCH.current_depth, processing_depth=MATCH.processing_depth
-        ),
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location="left",
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        ActiveState(state_ref=MATCH.state_ref),
-        TEST(lambda state_ref, state: state_ref == state),
-        TEST(lambda depth, processing_depth: depth == processing_depth),
-        TEST(lambda left: len(left) >= 2),
-        TEST(lambda sequence: sequence is not None),
-    )
-    def generate_cross_moves(
-        self, queue, left, right, elapsed_time, path, depth, current_depth, sequence
-    ):
-        left_list = list(left)
-        right_list = list(right)
-
-        for i in range(len(left_list)):
-            for j in range(i + 1, len(left_list)):
-                person1, person2 = left_list[i], left_list[j]
-                crossing_time = max(self.people[person1], self.people[person2])
-                new_time = elapsed_time + crossing_time
-
-                new_left = list(
-                    filter(lambda p: p not in [person1, person2], left_list)
-                )
-                new_right = sorted(right_list + [person1, person2])
-                new_path = list(path) + [("cross", (person1, person2), crossing_time)]
-
-                self.sequence_counter += 1
-                new_depth = depth + 1
-
-                self.declare(
-                    State(
-                        left=new_left,
-                        right=new_right,
-                        flashlight_location="right",
-                        elapsed_time=new_time,
-                        path=new_path,
-                        depth=new_depth,
-                        sequence=self.sequence_counter,
-                    )
-                )
-
-                (new_depth > current_depth) and self._update_bfs_queue(
-                    queue, new_depth, current_depth
-                )
-
-        self.declare(ProcessedState(sequence=sequence))
 
-    def _update_bfs_queue(self, queue, new_depth, current_depth):
-        (queue in self.facts) and self.retract(queue)
-        self.declare(BFSQueue(current_depth=new_depth, processing_depth=current_depth))
-        return True
+        if flashlight_location == LEFT and left:
+            budget = max_time - elapsed_time
+            self.generate_cross_moves(state, left, right, capacity, budget)
+        elif flashlight_location == RIGHT and left and right:
+            self.generate_return_moves(state, left, right)
 
-    @Rule(
-        AS.queue
-        << BFSQueue(
-            current_depth=MATCH.current_depth, processing_depth=MATCH.processing_depth
-        ),
-        AS.state
-        << State(
-            left=MATCH.left,
-            right=MATCH.right,
-            flashlight_location="right",
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
-            depth=MATCH.depth,
-            sequence=MATCH.sequence,
-        ),
-        ActiveState(state_ref=MATCH.state_ref),
-        TEST(lambda state_ref, state: state_ref == state),
-        TEST(lambda depth, processing_depth: depth == processing_depth),
-        TEST(lambda right: len(right) >= 1),
-        TEST(lambda left: len(left) > 0),
-        TEST(lambda sequence: sequence is not None),
-    )
-    def generate_return_moves(
-        self, queue, left, right, elapsed_time, path, depth, current_depth, sequence
-    ):
-        left_list = list(left)
-        right_list = list(right)
+    def generate_cross_moves(self, state, left, right, capacity, budget):
+        elapsed_time = state["elapsed_time"]
+        path = state["path"]
+        new_depth = state["depth"] + 1
 
-        for person in right_list:
-            crossing_time = self.people[person]
+        for group, crossing_time in self.roster.crossing_groups(left, capacity, budget):
             new_time = elapsed_time + crossing_time
-
-            new_left = sorted(left_list + [person])
-            new_right = list(filter(lambda p: p != person, right_list))
-            new_path = list(path) + [("return", (person,), crossing_time)]
+            new_left = left & ~group
+            new_right = right | group
+            move = ("cross", group, crossing_time)
+            if not self.checker.accepts(new_left, new_right, RIGHT, new_time, move):
+                continue
+            new_path = PathNode(path, move)
 
             self.sequence_counter += 1
-            new_depth = depth + 1
 
             self.declare(
                 State(
                     left=new_left,
                     right=new_right,
-                    flashlight_location="left",
+                    flashlight_location=RIGHT,
                     elapsed_time=new_time,
                     path=new_path,
                     depth=new_depth,
@@ -263,115 +230,208 @@ class BridgePuzzleSolverMovesBfs(KnowledgeEngine):
                 )
             )
 
-            (new_depth > current_depth) and self._update_bfs_queue(
-                queue, new_depth, current_depth
-            )
+    def generate_return_moves(self, state, left, right):
+        elapsed_time = state["elapsed_time"]
+        path = state["path"]
+        new_depth = state["depth"] + 1
+        times = self.roster.times
 
-        self.declare(ProcessedState(sequence=sequence))
+        for person in self.roster.return_candidates(right):
+            crossing_time = times[person]
+            new_time = elapsed_time + crossing_time
 
-    @Rule(
-        AS.queue
-        << BFSQueue(
-            current_depth=MATCH.current_depth, processing_depth=MATCH.processing_depth
-        ),
-        TEST(lambda processing_depth, current_depth: processing_depth < current_depth),
-    )
-    def advance_bfs_level(self, queue, processing_depth):
-        unprocessed_states = list(
-            filter(
-                lambda f: isinstance(f, State)
-                and hasattr(f, "depth")
-                and f.depth == processing_depth,
-                self.facts,
-            )
-        )
-        processed_sequences = list(
-            map(
-                lambda f: f.sequence,
-                filter(lambda f: isinstance(f, ProcessedState), self.facts),
-            )
-        )
+            group = 1 << person
+            new_left = left | group
+            new_right = right & ~group
+            move = ("return", group, crossing_time)
+            if not self.checker.accepts(new_left, new_right, LEFT, new_time, move):
+                continue
+            new_path = PathNode(path, move)
 
-        all_processed = all(
-            hasattr(state, "sequence") and state.sequence in processed_sequences
-            for state in unprocessed_states
-        )
-        all_processed and self._advance_to_next_level(queue, processing_depth)
+            self.sequence_counter += 1
 
-    def _advance_to_next_level(self, queue, processing_depth):
-        new_processing_depth = processing_depth + 1
-        (queue in self.facts) and self.retract(queue)
-        self.declare(
-            BFSQueue(
-                current_depth=queue["current_depth"],
-                processing_depth=new_processing_depth,
+            self.declare(
+                State(
+                    left=new_left,
+                    right=new_right,
+                    flashlight_location=LEFT,
+                    elapsed_time=new_time,
+                    path=new_path,
+                    depth=new_depth,
+                    sequence=self.sequence_counter,
+                )
             )
-        )
-        print(
-            f"\033[1m⚙️  BFS: Advancing to process depth {new_processing_depth}\033[0m\n"
-        )
-        return True
 
     @Rule(
-        AS.ready << ActiveState(state_ref=MATCH.state_ref),
-        AS.processed << ProcessedState(sequence=MATCH.sequence),
-        TEST(
-            lambda state_ref, sequence: hasattr(state_ref, "sequence")
-            and state_ref.sequence == sequence
+        AS.state
+        << BackwardState(
+            left=MATCH.left,
+            flashlight_location=MATCH.flashlight_location,
+            remaining_time=MATCH.remaining_time,
         ),
+        TimeConstraint(max_time=MATCH.max_time),
+        TEST(lambda remaining_time, max_time: remaining_time <= max_time),
+        salience=7,
     )
-    def cleanup_processing_markers(self, ready, processed):
-        self.retract(ready)
-        self.retract(processed)
+    def admit_backward_state(self, state, left, flashlight_location, remaining_time):
+        path = state["path"]
+        if not self.goal_visited.admit(left, flashlight_location, remaining_time, path):
+            self.retract(state)
+            return
+        key = self.goal_visited.key(left, flashlight_location)
+        self.goal_halves.setdefault(key, []).append((remaining_time, path))
 
     @Rule(
         AS.state
-        << State(
+        << BackwardState(
             left=MATCH.left,
             right=MATCH.right,
             flashlight_location=MATCH.flashlight_location,
-            elapsed_time=MATCH.elapsed_time,
-            path=MATCH.path,
+            remaining_time=MATCH.remaining_time,
             depth=MATCH.depth,
-            sequence=MATCH.sequence,
         ),
-        ActiveState(state_ref=MATCH.state_ref),
-        TEST(lambda state_ref, state: state_ref == state),
-        TEST(lambda depth: depth > 0),
-        TEST(lambda path: path is not None and len(path) > 0),
+        TimeConstraint(max_time=MATCH.max_time),
+        BridgeCapacity(capacity=MATCH.capacity),
+        salience=-10,
     )
-    def log_search_progress(
-        self, left, right, flashlight_location, elapsed_time, path, depth, sequence
+    def expand_backward_state(
+        self,
+        state,
+        left,
+        right,
+        flashlight_location,
+        remaining_time,
+        depth,
+        max_time,
+        capacity,
     ):
-        last_action = path[-1]
-        action, people, time_taken = last_action
+        if remaining_time >= self.midpoint:
+            return
+        if self.goal_visited.is_stale(left, flashlight_location, remaining_time):
+            return
+        self.expanded["backward"] += 1
+        if flashlight_location == RIGHT:
+            predecessors = self.reversed_crossings(left, right, capacity)
+        elif left != self.roster.full_mask:
+            predecessors = self.reversed_returns(left, right)
+        else:
+            return
+        for new_left, new_right, new_location, move in predecessors:
+            new_time = remaining_time + move[2]
+            if not self.checker.accepts(
+                left, right, flashlight_location, new_time, move
+            ):
+                continue
+            if new_time + self.time_from_start(new_right, new_location) > max_time:
+                continue
+            self.sequence_counter += 1
+            self.declare(
+                BackwardState(
+                    left=new_left,
+                    right=new_right,
+                    flashlight_location=new_location,
+                    remaining_time=new_time,
+                    path=PathNode(state["path"], move),
+                    depth=depth + 1,
+                    sequence=self.sequence_counter,
+                )
+            )
+
+    def time_from_start(self, right, flashlight_location):
+        return remaining_time_lower_bound(
+            self.roster, right, 1 - flashlight_location, self.capacity
+        )
+
+    def reversed_crossings(self, left, right, capacity):
+        for size in range(1, capacity + 1):
+            for ids in combinations(self.roster.members(right), size):
+                group = self.roster.mask_of_ids(ids)
+                previous_left = left | group
+                groups = self.forward_groups.get(previous_left)
+                if groups is None:
+                    groups = dict(self.roster.crossing_groups(previous_left, capacity))
+                    self.forward_groups[previous_left] = groups
+                if group in groups:
+                    move = ("cross", group, groups[group])
+                    yield previous_left, right & ~group, LEFT, move
+
+    def reversed_returns(self, left, right):
+        for person in self.roster.members(left):
+            group = 1 << person
+            previous_left = left & ~group
+            previous_right = right | group
+            if previous_left and person in self.roster.return_candidates(
+                previous_right
+            ):
+                move = ("return", group, self.roster.times[person])
+                yield previous_left, previous_right, RIGHT, move
+
+    @Rule(MeetInTheMiddle(), TimeConstraint(max_time=MATCH.max_time), salience=-20)
+    def splice_half_paths(self, max_time):
+        spliced = []
+        for key, arrivals in self.meeting.items():
+            best_remaining = self.goal_visited.best_times.get(key)
+            if best_remaining is None:
+                continue
+            best_time = self.visited.best_times[key]
+            suffixes = [
+                list(reversed(path.moves()))
+                for remaining_time, path in self.goal_halves[key]
+                if remaining_time == best_remaining
+            ]
+            for elapsed_time, path in arrivals:
+                if (
+                    elapsed_time != best_time
+                    or elapsed_time + best_remaining > max_time
+                ):
+                    continue
+                prefix = path.moves()
+                spliced.extend(
+                    (elapsed_time + best_remaining, prefix + suffix)
+                    for suffix in suffixes
+                )
+        for total_time, moves in sorted(spliced, key=lambda splice: splice[0]):
+            self.record_solution(moves, total_time)
+
+    def log_search_progress(self, state):
+        paint = self.log.paint
+        action, people, time_taken = self.roster.decode_move(state["path"].move)
         people_str = ", ".join(people)
-        print(f"⟬BFS Level {depth} (seq:{sequence})⟭ {action}: {people_str}")
-        print(
-            f"\033[31m⬅️  Left: {list(left)}\033[0m   \033[34m➡️  Right: {list(right)}\033[0m"
+        left = paint(RED, f"⬅️  Left: {self.roster.names_of(state['left'])}")
+        right = paint(BLUE, f"➡️  Right: {self.roster.names_of(state['right'])}")
+        flashlight = paint(
+            YELLOW, f"🔦  Flashlight: {SIDE_NAMES[state['flashlight_location']]}"
         )
-        print(
-            f"\033[33m🔦  Flashlight: {flashlight_location}\033[0m   \033[32m⏱️  Time: {elapsed_time}\033[0m"
+        clock = paint(GREEN, f"⏱️  Time: {state['elapsed_time']}")
+        self.log.node(
+            f"⟬BFS Level {state['depth']} (seq:{state['sequence']})⟭ {action}: {people_str}",
+            f"{left}   {right}",
+            f"{flashlight}   {clock}",
+            "",
         )
-        print("")
 
     def handle_cross_action(self, step, people, time_taken):
-        actions = {
-            2: lambda: print(
-                f"\033[31mStep {step}:\033[0m {people[0]} and {people[1]} cross together ⨠ \033[34m{time_taken} minutes\033[0m"
+        paint = self.log.paint
+        label = paint(RED, f"Step {step}:")
+        minutes = paint(BLUE, f"{time_taken} minutes")
+        people_count = len(people)
+        cross_handlers = {
+            2: lambda: self.log.solution(
+                f"{label} {people[0]} and {people[1]} cross together ⨠ {minutes}"
             ),
-            1: lambda: print(
-                f"\033[31mStep {step}:\033[0m {people[0]} crosses alone ⨠ \033[34m{time_taken} minutes\033[0m"
+            1: lambda: self.log.solution(
+                f"{label} {people[0]} crosses alone ⨠ {minutes}"
             ),
         }
-        actions.get(
-            len(people),
-            lambda: print(
-                f"\033[31mStep {step}:\033[0m {', '.join(people)} cross together ⨠ \033[34m{time_taken} minutes\033[0m"
-            ),
-        )()
+
+        def default_handler():
+            return self.log.solution(
+                f"{label} {', '.join(people)} cross together ⨠ {minutes}"
+            )
+
+        cross_handlers.get(people_count, default_handler)()
 
     def handle_return_action(self, step, people, time_taken):
-        print(
-            f"\033[31mStep {step}:\033[0m {people[0]} returns with flashlight ⨠ \033[34m{time_taken} minutes\033[0m"
-        )
+        label = self.log.paint(RED, f"Step {step}:")
+        minutes = self.log.paint(BLUE, f"{time_taken} minutes")
+        self.log.solution(f"{label} {people[0]} returns with flashlight ⨠ {minutes}")
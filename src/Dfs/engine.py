@@ -4,23 +4,34 @@ from Dfs.engine_constraints import BridgePuzzleSolverConstraints
 
 class BridgePuzzleSolver(BridgePuzzleSolverMoves, BridgePuzzleSolverConstraints):
     def print_final_summary(self):
-        print(f"\n{'='*80}")
-        print(f"FINAL SUMMARY: {len(self.solutions)} SOLUTION(S) FOUND")
-        print("=" * 80)
+        self.log.summary(f"\n{'='*80}")
+        self.log.summary(f"FINAL SUMMARY: {len(self.solutions)} SOLUTION(S) FOUND")
+        self.log.summary("=" * 80)
         [
-            print(f"\nSolution {i}: {sol['total_time']} minutes")
+            self.log.summary(f"\nSolution {i}: {sol['total_time']} minutes")
             or [
                 (
-                    print(
-                        f"  Step {j}: {people[0]} and {people[1]} cross → {time_taken} min"
+                    self.log.summary(
+                        f"  Step {j}: {' and '.join(people)} cross → {time_taken} min"
                     )
                     if action == "cross"
-                    else print(f"  Step {j}: {people[0]} returns → {time_taken} min")
-                )
-                for j, (action, people, time_taken) in enumerate(
-                    reversed(sol["moves"]), 1
+                    else self.log.summary(
+                        f"  Step {j}: {people[0]} returns → {time_taken} min"
+                    )
                 )
+                for j, (action, people, time_taken) in enumerate(sol["moves"], 1)
             ]
             for i, sol in enumerate(self.solutions, 1)
-        ] or print("No solutions found within the time limit.")
-        print("=" * 80)
+        ] or self.log.summary("No solutions found within the time limit.")
+        stats = self.visited.stats()
+        self.log.summary(
+            f"Visited table: {stats['entries']} entries, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['updates']} updates"
+        )
+        self.log.summary(self.checker.summary())
+        self.log.summary(
+            f"Working memory: peak {self.peak_facts} facts, "
+            f"{len(self.facts)} at the end of the search"
+        )
+        self.log.summary("=" * 80)
+        self.log.flush()
@@ -1,85 +1,244 @@
 from facts import *
+from roster import Roster
+from transposition import TranspositionTable
+from successors import SuccessorMixin
+from incremental import IncrementalMixin
+from constraints import ConstraintChecker
+from oracle import optimal_time, time_lower_bound
+from agenda_order import agenda_strategy
+from search_log import *
 from experta import *
 import collections
 import collections.abc
 
 collections.Mapping = collections.abc.Mapping
 
+SEARCH_MODES = ("all", "optimal", "best", "first")
 
-class BridgePuzzleSolverMoves(KnowledgeEngine):
-    def __init__(self, people, max_time=17):
+
+class BridgePuzzleSolverMoves(SuccessorMixin, IncrementalMixin, KnowledgeEngine):
+    def __init__(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        mode="all",
+        lifecycle=False,
+        fused=False,
+        log=None,
+        agenda="depth",
+    ):
         super().__init__()
+        self.strategy = agenda_strategy(agenda)
+        self.log = log if log is not None else SearchLog()
+        self.visited = TranspositionTable()
+        self.derived = {}
+        self.peak_facts = 0
+        self.configure(
+            people, max_time, capacity, symmetry, dominance, mode, lifecycle, fused
+        )
+
+    def configure(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        mode="all",
+        lifecycle=False,
+        fused=False,
+    ):
+        if capacity < 1:
+            raise ValueError("bridge capacity must be at least 1")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"unknown search mode {mode!r}")
+        self.mode = mode
+        self.lifecycle = lifecycle
+        self.fused = fused
         self.people = {name: float(time) for name, time in people}
+        self.roster = Roster(people, symmetry, dominance)
+        self.visited.clear()
         self.max_time = float(max_time)
+        self.capacity = capacity
+        self.solutions = []
+        self.solution_count = 0
+
+    def finds_optimal_only(self):
+        return self.mode in ("optimal", "best")
+
+    def solve(self, max_time=None):
+        if max_time is not None:
+            self.max_time = float(max_time)
         self.solutions = []
         self.solution_count = 0
+        self.reset()
+        self.run()
+        return self.solutions
 
     @Rule()
     def initialize(self):
-        left_side = list(self.people.keys())
+        if self.warm_visited:
+            self.visited.reset_stats()
+        else:
+            self.visited.clear()
+        self.state_buckets.clear()
+        self.derived.clear()
+        self.checker = ConstraintChecker(self.max_time, self.capacity)
+        self.peak_facts = len(self.facts)
+        self.bound = self.max_time
+        needed = time_lower_bound(self.roster, self.capacity)
+        if needed > self.max_time:
+            self.log.summary(
+                f"No schedule fits in {self.max_time} minutes "
+                f"(the fastest schedule takes at least {needed})."
+            )
+            return
+        optimum = optimal_time(self.roster.times, self.capacity)
+        self.floor = needed if optimum is None else optimum
+        self.strict = self.mode == "best" and not self.warm_visited
+        if self.mode in ("optimal", "best") and optimum is not None:
+            self.bound = optimum
+        self.visited.admit(self.roster.full_mask, LEFT, 0.0)
         self.declare(
             State(
-                left=left_side,
-                right=[],
-                flashlight_location="left",
+                left=self.roster.full_mask,
+                right=0,
+                flashlight_location=LEFT,
                 elapsed_time=0.0,
-                path=[],
+                path=None,
                 depth=0,
             )
         )
-        self.declare(TimeConstraint(max_time=17.0))
+        self.declare(TimeConstraint(max_time=self.max_time))
+        self.declare(BridgeCapacity(capacity=self.capacity))
+        self.fused and self.declare(FusedExpansion())
+        self.log.traces_nodes and self.declare(TraceNodes())
+
+    def run(self, steps=float("inf")):
+        super().run(steps)
+        self.log.flush()
+
+    def declare(self, *facts):
+        declared = super().declare(*facts)
+        self.peak_facts = max(self.peak_facts, len(self.facts))
+        return declared
+
+    def derive(self, state, fact):
+        fact = self.declare(fact)
+        self.lifecycle and self.derived.setdefault(state.__factid__, []).append(
+            fact.__factid__
+        )
+
+    def release(self, state_id):
+        for fact_id in self.derived.pop(state_id, ()):
+            fact_id in self.facts and self.retract(fact_id)
+        state = self.facts.get(state_id)
+        if state is not None:
+            self.state_buckets.discard(state)
+            self.retract(state_id)
+
+    def declare_potential_states(self, moves, depth, move_type):
+        for left, right, flashlight_location, elapsed_time, path in moves:
+            self.declare(
+                PotentialState(
+                    left=left,
+                    right=right,
+                    flashlight_location=flashlight_location,
+                    elapsed_time=elapsed_time,
+                    path=path,
+                    depth=depth + 1,
+                    move_type=move_type,
+                )
+            )
+
+    def tighten_bound(self, total_time):
+        self.bound = total_time
+        self.solutions = [
+            solution
+            for solution in self.solutions
+            if solution["total_time"] <= total_time
+        ]
+        for fact_id, fact in list(self.facts.items()):
+            if not isinstance(fact, (State, PotentialState)):
+                continue
+            location = fact["flashlight_location"]
+            if self.within_bound(fact["left"], location, fact["elapsed_time"]):
+                continue
+            if isinstance(fact, State):
+                self.release(fact_id)
+            else:
+                self.retract(fact_id)
 
     @Rule(
         AS.state << State(elapsed_time=MATCH.elapsed_time),
         TimeConstraint(max_time=MATCH.max_time),
+        NOT(FusedExpansion()),
         TEST(lambda elapsed_time, max_time: elapsed_time < max_time),
     )
     def mark_valid_time_window(self, state, elapsed_time):
-        self.declare(ValidTimeWindow(state_ref=state, elapsed_time=elapsed_time))
+        self.derive(
+            state, ValidTimeWindow(state_id=state.__factid__, elapsed_time=elapsed_time)
+        )
 
     @Rule(
-        AS.state << State(left=MATCH.left, flashlight_location="left"),
-        TEST(lambda left: len(left) >= 2),
+        AS.state << State(left=MATCH.left, flashlight_location=LEFT),
+        NOT(FusedExpansion()),
+        TEST(lambda left: left != 0),
     )
     def mark_sufficient_people_left(self, state, left):
-        self.declare(SufficientPeople(state_ref=state, side="left", count=len(left)))
+        self.derive(
+            state,
+            SufficientPeople(
+                state_id=state.__factid__, side="left", count=left.bit_count()
+            ),
+        )
 
     @Rule(
         AS.state
-        << State(left=MATCH.left, right=MATCH.right, flashlight_location="right"),
-        TEST(lambda right: len(right) >= 1),
-        TEST(lambda left: len(left) > 0),
+        << State(left=MATCH.left, right=MATCH.right, flashlight_location=RIGHT),
+        NOT(FusedExpansion()),
+        TEST(lambda right: right != 0),
+        TEST(lambda left: left != 0),
     )
     def mark_sufficient_people_right(self, state, right):
-        self.declare(SufficientPeople(state_ref=state, side="right", count=len(right)))
+        self.derive(
+            state,
+            SufficientPeople(
+                state_id=state.__factid__, side="right", count=right.bit_count()
+            ),
+        )
 
     @Rule(
         AS.state
         << State(
             left=MATCH.left,
             right=MATCH.right,
-            flashlight_location="left",
+            flashlight_location=LEFT,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
             depth=MATCH.depth,
         ),
-        ValidTimeWindow(state_ref=MATCH.state_ref),
-        SufficientPeople(state_ref=MATCH.state_ref, side="left"),
-        TEST(lambda state_ref, state: state_ref == state),
+        ValidTimeWindow(state_id=MATCH.state_id),
+        SufficientPeople(state_id=MATCH.state_id, side="left"),
+        TEST(lambda state_id, state: state_id == state.__factid__),
     )
     def create_cross_move_condition(
         self, state, left, right, elapsed_time, path, depth
     ):
-        self.declare(
+        self.derive(
+            state,
             ValidMoveCondition(
-                state_ref=state,
+                state_id=state.__factid__,
                 move_type="cross",
                 left=left,
                 right=right,
                 elapsed_time=elapsed_time,
                 path=path,
                 depth=depth,
-            )
+            ),
         )
 
     @Rule(
@@ -87,70 +246,56 @@ class BridgePuzzleSolverMoves(KnowledgeEngine):
         << State(
             left=MATCH.left,
             right=MATCH.right,
-            flashlight_location="right",
+            flashlight_location=RIGHT,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
             depth=MATCH.depth,
         ),
-        ValidTimeWindow(state_ref=MATCH.state_ref),
-        SufficientPeople(state_ref=MATCH.state_ref, side="right"),
-        TEST(lambda state_ref, state: state_ref == state),
+        ValidTimeWindow(state_id=MATCH.state_id),
+        SufficientPeople(state_id=MATCH.state_id, side="right"),
+        TEST(lambda state_id, state: state_id == state.__factid__),
     )
     def create_return_move_condition(
         self, state, left, right, elapsed_time, path, depth
     ):
-        self.declare(
+        self.derive(
+            state,
             ValidMoveCondition(
-                state_ref=state,
+                state_id=state.__factid__,
                 move_type="return",
                 left=left,
                 right=right,
                 elapsed_time=elapsed_time,
                 path=path,
                 depth=depth,
-            )
+            ),
         )
 
     @Rule(
         ValidMoveCondition(
-            state_ref=MATCH.state_ref,
+            state_id=MATCH.state_id,
             move_type="cross",
             left=MATCH.left,
             right=MATCH.right,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
             depth=MATCH.depth,
-        )
+        ),
+        TimeConstraint(max_time=MATCH.max_time),
+        BridgeCapacity(capacity=MATCH.capacity),
     )
-    def cross_left_to_right(self, left, right, elapsed_time, path, depth):
-        left = list(left)
-        right = list(right)
-        for i in range(len(left)):
-            for j in range(i + 1, len(left)):
-                person1, person2 = left[i], left[j]
-                crossing_time = max(self.people[person1], self.people[person2])
-
-                excluded_people = {person1, person2}
-                new_left = list(filter(lambda p: p not in excluded_people, left))
-                new_right = sorted(list(right) + [person1, person2])
-                new_time = elapsed_time + crossing_time
-                new_path = list(path) + [("cross", (person1, person2), crossing_time)]
-
-                self.declare(
-                    PotentialState(
-                        left=new_left,
-                        right=new_right,
-                        flashlight_location="right",
-                        elapsed_time=new_time,
-                        path=new_path,
-                        depth=depth + 1,
-                        move_type="cross",
-                    )
-                )
+    def cross_left_to_right(
+        self, state_id, left, right, elapsed_time, path, depth, max_time, capacity
+    ):
+        self.lifecycle and self.release(state_id)
+        if self.visited.is_stale(left, LEFT, elapsed_time):
+            return
+        moves = self.crossings(left, right, elapsed_time, path, max_time, capacity)
+        self.declare_potential_states(self.best_first(moves), depth, "cross")
 
     @Rule(
         ValidMoveCondition(
-            state_ref=MATCH.state_ref,
+            state_id=MATCH.state_id,
             move_type="return",
             left=MATCH.left,
             right=MATCH.right,
@@ -159,83 +304,101 @@ class BridgePuzzleSolverMoves(KnowledgeEngine):
             depth=MATCH.depth,
         )
     )
-    def return_right_to_left(self, left, right, elapsed_time, path, depth):
-        left = list(left)
-        right = list(right)
-        for person in right:
-            crossing_time = self.people[person]
-
-            new_left = sorted(list(left) + [person])
-            new_right = list(filter(lambda p: p != person, right))
-            new_time = elapsed_time + crossing_time
-            new_path = list(path) + [("return", (person,), crossing_time)]
-
-            self.declare(
-                PotentialState(
-                    left=new_left,
-                    right=new_right,
-                    flashlight_location="left",
-                    elapsed_time=new_time,
-                    path=new_path,
-                    depth=depth + 1,
-                    move_type="return",
-                )
-            )
+    def return_right_to_left(self, state_id, left, right, elapsed_time, path, depth):
+        self.lifecycle and self.release(state_id)
+        if self.visited.is_stale(left, RIGHT, elapsed_time):
+            return
+        moves = self.returns(left, right, elapsed_time, path)
+        self.declare_potential_states(self.best_first(moves), depth, "return")
 
     @Rule(
-        AS.state
-        << State(
+        AS.potential
+        << PotentialState(
             left=MATCH.left,
             right=MATCH.right,
             flashlight_location=MATCH.flashlight_location,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
+            depth=MATCH.depth,
+            move_type=MATCH.move_type,
         ),
-        NOT(
-            VisitedState(
-                left=MATCH.left,
-                right=MATCH.right,
-                flashlight_location=MATCH.flashlight_location,
-            )
-        ),
+        TimeConstraint(max_time=MATCH.max_time),
+        TEST(lambda elapsed_time, max_time: elapsed_time <= max_time),
     )
-    def record_new_state(self, left, right, flashlight_location, elapsed_time):
+    def validate_potential_state(
+        self, potential, left, right, flashlight_location, elapsed_time, path, depth
+    ):
+        self.lifecycle and self.retract(potential)
+        if not self.visited.admit(
+            left, flashlight_location, elapsed_time, path, self.strict
+        ):
+            return
         self.declare(
-            VisitedState(
+            State(
                 left=left,
                 right=right,
                 flashlight_location=flashlight_location,
-                best_time=elapsed_time,
+                elapsed_time=elapsed_time,
+                path=path,
+                depth=depth,
             )
         )
 
     @Rule(
-        AS.potential
-        << PotentialState(
+        AS.state
+        << State(
             left=MATCH.left,
             right=MATCH.right,
             flashlight_location=MATCH.flashlight_location,
             elapsed_time=MATCH.elapsed_time,
             path=MATCH.path,
             depth=MATCH.depth,
-            move_type=MATCH.move_type,
         ),
+        FusedExpansion(),
         TimeConstraint(max_time=MATCH.max_time),
-        TEST(lambda elapsed_time, max_time: elapsed_time <= max_time),
+        BridgeCapacity(capacity=MATCH.capacity),
+        TEST(lambda elapsed_time, max_time: elapsed_time < max_time),
+        TEST(
+            lambda left, right, flashlight_location: left != 0
+            and (flashlight_location == LEFT or right != 0)
+        ),
     )
-    def validate_potential_state(
-        self, left, right, flashlight_location, elapsed_time, path, depth
+    def expand_state(
+        self,
+        state,
+        left,
+        right,
+        flashlight_location,
+        elapsed_time,
+        path,
+        depth,
+        max_time,
+        capacity,
     ):
-        self.declare(
-            State(
-                left=left,
-                right=right,
-                flashlight_location=flashlight_location,
-                elapsed_time=elapsed_time,
-                path=path,
-                depth=depth,
+        self.lifecycle and self.release(state.__factid__)
+        if self.visited.is_stale(left, flashlight_location, elapsed_time):
+            return
+        if flashlight_location == LEFT:
+            moves = self.crossings(left, right, elapsed_time, path, max_time, capacity)
+        else:
+            moves = self.returns(left, right, elapsed_time, path)
+        for new_left, new_right, new_location, new_time, new_path in self.best_first(
+            moves
+        ):
+            if not self.visited.admit(
+                new_left, new_location, new_time, new_path, self.strict
+            ):
+                continue
+            self.declare(
+                State(
+                    left=new_left,
+                    right=new_right,
+                    flashlight_location=new_location,
+                    elapsed_time=new_time,
+                    path=new_path,
+                    depth=depth + 1,
+                )
             )
-        )
 
     @Rule(
         AS.state
@@ -247,20 +410,25 @@ class BridgePuzzleSolverMoves(KnowledgeEngine):
             path=MATCH.path,
             depth=MATCH.depth,
         ),
+        TraceNodes(),
         TEST(lambda depth: depth > 0),
     )
     def log_search_tree_node(
         self, left, right, flashlight_location, elapsed_time, path, depth
     ):
-        last_action = path[-1] or (None, (), 0)
-        action, people, time_taken = last_action
-        left_list = list(left)
-        right_list = list(right)
+        if not self.log.sample_node():
+            return
+        paint = self.log.paint
+        action, people, time_taken = self.roster.decode_move(path.move)
+        left_list = self.roster.names_of(left)
+        right_list = self.roster.names_of(right)
         people_str = ", ".join(people)
-        print(f"⟬Branch {depth}⟭ {action}: {people_str}")
-        print(f"\033[31m⬅️  Left: {left_list}\033[0m")
-        print(f"\033[34m➡️  Right: {right_list}\033[0m")
-        print(
-            f"\033[33m🔦  Flashlight: {flashlight_location}\033[0m   \033[32m⏱️  Time: {elapsed_time}\033[0m"
+        flashlight = paint(YELLOW, f"🔦  Flashlight: {SIDE_NAMES[flashlight_location]}")
+        clock = paint(GREEN, f"⏱️  Time: {elapsed_time}")
+        self.log.node(
+            f"⟬Branch {depth}⟭ {action}: {people_str}",
+            paint(RED, f"⬅️  Left: {left_list}"),
+            paint(BLUE, f"➡️  Right: {right_list}"),
+            f"{flashlight}   {clock}",
+            "",
         )
-        print("")
@@ -0,0 +1,204 @@
+import math
+from collections import deque
+
+from facts import LEFT, RIGHT
+from roster import Roster
+from transposition import TranspositionTable
+from successors import SuccessorMixin
+from incremental import IncrementalMixin
+from oracle import optimal_time, time_lower_bound
+from search_log import SearchLog
+from constraints import ConstraintChecker
+
+SEARCH_MODES = ("all", "optimal", "best", "first")
+ORDERS = ("depth", "breadth")
+
+
+class BridgePuzzleSolverFast(SuccessorMixin, IncrementalMixin):
+    def __init__(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        mode="all",
+        log=None,
+        agenda="depth",
+    ):
+        self.log = log if log is not None else SearchLog()
+        self.visited = TranspositionTable()
+        self.configure(people, max_time, capacity, symmetry, dominance, mode, agenda)
+
+    def configure(
+        self,
+        people,
+        max_time=17,
+        capacity=2,
+        symmetry=False,
+        dominance=False,
+        mode="all",
+        agenda="depth",
+    ):
+        if capacity < 1:
+            raise ValueError("bridge capacity must be at least 1")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"unknown search mode {mode!r}")
+        if agenda not in ORDERS:
+            raise ValueError(f"the fast solver cannot order states by {agenda!r}")
+        if agenda == "breadth" and mode != "all":
+            raise ValueError(f"search mode {mode!r} needs depth-first order")
+        self.mode = mode
+        self.order = agenda
+        self.people = {name: float(time) for name, time in people}
+        self.roster = Roster(people, symmetry, dominance)
+        self.visited.clear()
+        self.max_time = float(max_time)
+        self.capacity = capacity
+        self.solutions = []
+        self.solution_count = 0
+
+    def finds_optimal_only(self):
+        return self.mode in ("optimal", "best")
+
+    def solve(self, max_time=None):
+        if max_time is not None:
+            self.max_time = float(max_time)
+        self.solutions = []
+        self.solution_count = 0
+        if self.warm_visited:
+            self.visited.reset_stats()
+        else:
+            self.visited.clear()
+        self.checker = ConstraintChecker(self.max_time, self.capacity)
+        self.bound = self.max_time
+        self.halted = False
+        needed = time_lower_bound(self.roster, self.capacity)
+        if needed > self.max_time:
+            self.log.summary(
+                f"No schedule fits in {self.max_time} minutes "
+                f"(the fastest schedule takes at least {needed})."
+            )
+        elif self.order == "breadth":
+            self.search_breadth_first()
+        else:
+            optimum = optimal_time(self.roster.times, self.capacity)
+            self.floor = needed if optimum is None else optimum
+            self.strict = self.mode == "best" and not self.warm_visited
+            if self.mode in ("optimal", "best") and optimum is not None:
+                self.bound = optimum
+            self.visited.admit(self.roster.full_mask, LEFT, 0.0)
+            self.visit(self.roster.full_mask, 0, LEFT, 0.0, None)
+        self.log.flush()
+        return self.solutions
+
+    def within_bound(self, left, flashlight_location, elapsed_time):
+        return self.order == "breadth" or super().within_bound(
+            left, flashlight_location, elapsed_time
+        )
+
+    def successors(self, left, right, flashlight_location, elapsed_time, path):
+        if flashlight_location == LEFT and left:
+            return self.crossings(
+                left, right, elapsed_time, path, self.max_time, self.capacity
+            )
+        if flashlight_location == RIGHT and left and right:
+            return self.returns(left, right, elapsed_time, path)
+        return ()
+
+    def record(self, elapsed_time, path):
+        self.solution_count += 1
+        self.solutions.append(
+            {
+                "moves": self.roster.decode_path(path.moves()),
+                "total_time": elapsed_time,
+                "solution_number": self.solution_count,
+            }
+        )
+
+    def tighten_bound(self, total_time):
+        self.bound = total_time
+        self.solutions = [
+            solution
+            for solution in self.solutions
+            if solution["total_time"] <= total_time
+        ]
+
+    def visit(self, left, right, flashlight_location, elapsed_time, path):
+        if left == 0 and flashlight_location == RIGHT:
+            if elapsed_time > self.bound:
+                return
+            if self.mode == "optimal" and elapsed_time < self.bound:
+                self.tighten_bound(elapsed_time)
+            if self.mode == "best":
+                self.tighten_bound(math.nextafter(elapsed_time, -math.inf))
+            self.record(elapsed_time, path)
+            self.halted = self.mode == "first" or (
+                self.mode == "best" and elapsed_time <= self.floor
+            )
+            return
+        if elapsed_time >= self.max_time:
+            return
+        if self.visited.is_stale(left, flashlight_location, elapsed_time):
+            return
+        children = list(
+            self.best_first(
+                self.successors(left, right, flashlight_location, elapsed_time, path)
+            )
+        )
+        for child in reversed(children):
+            if self.halted:
+                return
+            new_left, _, new_location, new_time, new_path = child
+            if self.mode in ("optimal", "best") and not self.within_bound(
+                new_left, new_location, new_time
+            ):
+                continue
+            if self.visited.admit(
+                new_left, new_location, new_time, new_path, self.strict
+            ):
+                self.visit(*child)
+
+    def search_breadth_first(self):
+        self.visited.admit(self.roster.full_mask, LEFT, 0.0)
+        frontier = deque([(self.roster.full_mask, 0, LEFT, 0.0, None)])
+        while frontier:
+            left, right, flashlight_location, elapsed_time, path = frontier.popleft()
+            if self.visited.is_stale(left, flashlight_location, elapsed_time):
+                continue
+            for child in self.successors(
+                left, right, flashlight_location, elapsed_time, path
+            ):
+                new_left, _, new_location, new_time, new_path = child
+                if self.visited.is_stale(new_left, new_location, new_time):
+                    continue
+                self.visited.admit(new_left, new_location, new_time, new_path)
+                if new_left == 0 and new_location == RIGHT:
+                    self.record(new_time, new_path)
+                else:
+                    frontier.append(child)
+
+    def print_final_summary(self):
+        self.log.summary(f"\n{'='*80}")
+        self.log.summary(f"FINAL SUMMARY: {len(self.solutions)} SOLUTION(S) FOUND")
+        self.log.summary("=" * 80)
+        for i, solution in enumerate(self.solutions, 1):
+            self.log.summary(f"\nSolution {i}: {solution['total_time']} minutes")
+            for j, (action, people, time_taken) in enumerate(solution["moves"], 1):
+                if action == "cross":
+                    self.log.summary(
+                        f"  Step {j}: {' and '.join(people)} cross → {time_taken} min"
+                    )
+                else:
+                    self.log.summary(
+                        f"  Step {j}: {people[0]} returns → {time_taken} min"
+                    )
+        self.solutions or self.log.summary("No solutions found within the time limit.")
+        stats = self.visited.stats()
+        self.log.summary(
+            f"Visited table: {stats['entries']} entries, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['updates']} updates"
+        )
+        self.log.summary(self.checker.summary())
+        self.log.summary("=" * 80)
+        self.log.flush()
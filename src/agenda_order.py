@@ -0,0 +1,83 @@
+import abc
+import bisect
+
+from experta.abstract import Strategy
+
+UNORDERED = (float("inf"),)
+
+
+class StateOrderStrategy(Strategy):
+    newest_first = True
+
+    @abc.abstractmethod
+    def state_order(self, fact):
+        pass
+
+    def concerned_state(self, activation):
+        states = [fact for fact in activation.facts if "depth" in fact]
+        return max(states, key=lambda fact: fact["__factid__"], default=None)
+
+    def get_key(self, activation):
+        fact_ids = sorted(
+            (fact["__factid__"] for fact in activation.facts), reverse=True
+        )
+        if not self.newest_first:
+            fact_ids = [-fact_id for fact_id in reversed(fact_ids)]
+        state = self.concerned_state(activation)
+        order = UNORDERED if state is None else self.state_order(state)
+        return (activation.rule.salience, order, fact_ids)
+
+    def _update_agenda(self, agenda, added, removed):
+        activations = agenda.activations
+        for activation in removed:
+            activation.key = self.get_key(activation)
+            index = bisect.bisect_left(activations, activation)
+            while index < len(activations) and activations[index].key == activation.key:
+                if activations[index] == activation:
+                    del activations[index]
+                    break
+                index += 1
+
+        for activation in added:
+            activation.key = self.get_key(activation)
+            bisect.insort(activations, activation)
+
+
+class DepthFirstStrategy(StateOrderStrategy):
+    def state_order(self, fact):
+        return (fact["depth"],)
+
+
+class BreadthFirstStrategy(StateOrderStrategy):
+    newest_first = False
+
+    def state_order(self, fact):
+        return (-fact["depth"],)
+
+
+class CheapestFirstStrategy(StateOrderStrategy):
+    def __init__(self, cost=None):
+        super().__init__()
+        self.cost = cost
+
+    def state_order(self, fact):
+        if self.cost is not None:
+            cost = self.cost(fact)
+        elif "elapsed_time" in fact:
+            cost = fact["elapsed_time"]
+        else:
+            cost = fact["remaining_time"]
+        return (-cost,)
+
+
+AGENDA_STRATEGIES = {
+    "depth": DepthFirstStrategy,
+    "breadth": BreadthFirstStrategy,
+    "cheapest": CheapestFirstStrategy,
+}
+
+
+def agenda_strategy(name):
+    if name not in AGENDA_STRATEGIES:
+        raise ValueError(f"unknown agenda strategy {name!r}")
+    return AGENDA_STRATEGIES[name]()
@@ -0,0 +1,349 @@
+import json
+import multiprocessing
+import os
+import time
+
+from oracle import optimal_time
+from profiler import profiled
+from search_log import SearchLog
+from solution_cache import (
+    DISK_LIMIT,
+    SolutionCache,
+    cache_key,
+    canonical_people,
+    pack,
+    unpack,
+)
+
+STRATEGIES = ("dfs", "bfs", "astar", "ucs", "fast")
+
+_worker_engines = {}
+_worker_caches = {}
+
+
+def normalize_people(people):
+    if isinstance(people, dict):
+        people = people.items()
+    return [(str(name), float(travel_time)) for name, travel_time in people]
+
+
+def solver_class(strategy):
+    if strategy in ("astar", "ucs"):
+        from Astar.engine_astar import BridgePuzzleSolverAstar
+
+        return BridgePuzzleSolverAstar
+    if strategy == "bfs":
+        from Bfs.engine_bfs import BridgePuzzleSolverBfs
+
+        return BridgePuzzleSolverBfs
+    if strategy == "dfs":
+        from Dfs.engine import BridgePuzzleSolver
+
+        return BridgePuzzleSolver
+    if strategy == "fast":
+        from Fast.engine_fast import BridgePuzzleSolverFast
+
+        return BridgePuzzleSolverFast
+    raise ValueError(f"unknown strategy {strategy!r}")
+
+
+def search_mode(
+    strategy, mode="all", lifecycle=False, fused=False, bidirectional=False
+):
+    if bidirectional and strategy != "bfs":
+        raise ValueError("bidirectional search needs the bfs strategy")
+    if strategy == "dfs":
+        return {"mode": mode, "lifecycle": lifecycle, "fused": fused}
+    if lifecycle:
+        raise ValueError("fact lifecycle cleanup needs the dfs strategy")
+    if fused:
+        raise ValueError("fused expansion needs the dfs strategy")
+    if strategy == "fast":
+        return {"mode": mode}
+    if mode != "all":
+        raise ValueError(f"search mode {mode!r} needs the dfs or fast strategy")
+    if strategy == "bfs":
+        return {"bidirectional": bidirectional}
+    return {}
+
+
+def solver_options(
+    strategy, mode="all", agenda=None, lifecycle=False, fused=False, bidirectional=False
+):
+    if strategy in ("astar", "ucs"):
+        if agenda is not None:
+            raise ValueError("the A* engines always expand the cheapest state first")
+        return {
+            "heuristic": strategy == "astar",
+            **search_mode(strategy, mode, lifecycle, fused, bidirectional),
+        }
+    options = search_mode(strategy, mode, lifecycle, fused, bidirectional)
+    if agenda is not None:
+        options["agenda"] = agenda
+    return options
+
+
+def build_solver(
+    strategy,
+    people,
+    max_time,
+    capacity=2,
+    symmetry=False,
+    dominance=False,
+    log=None,
+    mode="all",
+    profile=False,
+    agenda=None,
+    lifecycle=False,
+    fused=False,
+    bidirectional=False,
+):
+    engine_class = solver_class(strategy)
+    if profile:
+        engine_class = profiled(engine_class)
+    return engine_class(
+        people,
+        max_time,
+        capacity,
+        symmetry,
+        dominance,
+        log=log,
+        **solver_options(strategy, mode, agenda, lifecycle, fused, bidirectional),
+    )
+
+
+def warm_engine(
+    strategy,
+    people,
+    max_time,
+    capacity=2,
+    symmetry=False,
+    dominance=False,
+    mode="all",
+    lifecycle=False,
+    fused=False,
+    bidirectional=False,
+):
+    engine = _worker_engines.get(strategy)
+    if engine is None:
+        engine = build_solver(
+            strategy,
+            people,
+            max_time,
+            capacity,
+            symmetry,
+            dominance,
+            SearchLog("off"),
+            mode,
+            lifecycle=lifecycle,
+            fused=fused,
+            bidirectional=bidirectional,
+        )
+        _worker_engines[strategy] = engine
+    else:
+        engine.configure(
+            people,
+            max_time,
+            capacity,
+            symmetry,
+            dominance,
+            **search_mode(strategy, mode, lifecycle, fused, bidirectional),
+        )
+    return engine
+
+
+def worker_cache(path, disk_limit=DISK_LIMIT):
+    cache = _worker_caches.get(path)
+    if cache is None:
+        cache = _worker_caches[path] = SolutionCache(path, disk_limit=disk_limit)
+    return cache
+
+
+def engine_result(engine, strategy, people, max_time, capacity, seconds, expand=False):
+    found = engine.solutions
+    if expand:
+        found = engine.roster.expand_solutions(found)
+    solutions = [
+        {
+            "total_time": solution["total_time"],
+            "moves": [
+                [action, list(names), time_taken]
+                for action, names, time_taken in solution["moves"]
+            ],
+        }
+        for solution in found
+    ]
+    result = {
+        "strategy": strategy,
+        "people": [[name, travel_time] for name, travel_time in people],
+        "capacity": capacity,
+        "symmetry": engine.roster.symmetric,
+        "dominance": sorted(engine.roster.dominance),
+        "max_time": float(max_time),
+        "best_time": min(
+            (solution["total_time"] for solution in solutions), default=None
+        ),
+        "solutions": solutions,
+        "seconds": round(seconds, 6),
+    }
+    result["rejections"] = engine.checker.as_dict()
+    if strategy == "dfs":
+        result["peak_facts"] = engine.peak_facts
+    return result
+
+
+def cost_result(people, max_time, capacity=2):
+    started = time.perf_counter()
+    best_time = optimal_time([travel_time for _, travel_time in people], capacity)
+    source = "oracle"
+    if best_time is None:
+        engine = warm_engine(
+            "astar", people, max_time, capacity, True, ("fastest_return",)
+        )
+        engine.solve()
+        best_time = min(
+            (solution["total_time"] for solution in engine.solutions), default=None
+        )
+        source = "astar"
+    feasible = best_time is not None and best_time <= max_time
+    return {
+        "people": [[name, travel_time] for name, travel_time in people],
+        "capacity": capacity,
+        "max_time": float(max_time),
+        "best_time": best_time if feasible else None,
+        "feasible": feasible,
+        "source": source,
+        "seconds": round(time.perf_counter() - started, 6),
+    }
+
+
+def solve_instance(
+    instance,
+    strategy="dfs",
+    max_time=17,
+    capacity=2,
+    symmetry=False,
+    dominance=False,
+    expand=False,
+    cost_only=False,
+    mode="all",
+    lifecycle=False,
+    fused=False,
+    incremental=False,
+    bidirectional=False,
+    cache=None,
+    cache_limit=DISK_LIMIT,
+):
+    if "people" not in instance:
+        raise ValueError("instance has no 'people'")
+    people = normalize_people(instance["people"])
+    strategy = instance.get("strategy", strategy)
+    max_time = instance.get("max_time", max_time)
+    capacity = instance.get("capacity", capacity)
+    symmetry = instance.get("symmetry", symmetry)
+    dominance = instance.get("dominance", dominance)
+    mode = instance.get("mode", mode)
+    lifecycle = instance.get("lifecycle", lifecycle)
+    fused = instance.get("fused", fused)
+    bidirectional = instance.get("bidirectional", bidirectional)
+    incremental = instance.get("incremental", incremental)
+    expand = instance.get("expand", expand)
+    if instance.get("cost_only", cost_only):
+        return cost_result(people, max_time, capacity)
+
+    started = time.perf_counter()
+    solution_cache = None if cache is None else worker_cache(cache, cache_limit)
+    if solution_cache is not None:
+        people = canonical_people(people)
+        key = cache_key(
+            strategy,
+            people,
+            max_time,
+            capacity,
+            symmetry,
+            dominance,
+            mode,
+            None,
+            lifecycle,
+            fused,
+            expand,
+            bidirectional,
+        )
+        tier, value = solution_cache.get(key)
+        if value is not None:
+            result = unpack(value, people)
+            result["seconds"] = round(time.perf_counter() - started, 6)
+            result["cache"] = tier
+            return result
+
+    engine = _worker_engines.get(strategy)
+    options = search_mode(strategy, mode, lifecycle, fused, bidirectional)
+    resolved = (
+        incremental
+        and engine is not None
+        and engine.finds_optimal_only()
+        and engine.can_resolve(people, capacity, symmetry, dominance, **options)
+    )
+    if resolved:
+        engine.resolve(people, max_time)
+    else:
+        engine = warm_engine(
+            strategy,
+            people,
+            max_time,
+            capacity,
+            symmetry,
+            dominance,
+            mode,
+            lifecycle,
+            fused,
+            bidirectional,
+        )
+        engine.solve()
+    seconds = time.perf_counter() - started
+    result = engine_result(
+        engine, strategy, people, max_time, capacity, seconds, expand
+    )
+    if resolved:
+        result["resolve"] = engine.resolve_stats
+    elif solution_cache is not None:
+        solution_cache.put(key, pack(result, people))
+    if solution_cache is not None:
+        result["cache"] = "miss"
+    return result
+
+
+def _solve_task(task):
+    instance, defaults = task
+    try:
+        if isinstance(instance, str):
+            instance = json.loads(instance)
+        result = solve_instance(instance, **defaults)
+    except (ValueError, TypeError, KeyError, AttributeError) as error:
+        result = {"error": str(error)}
+    if isinstance(instance, dict) and "id" in instance:
+        result = {"id": instance["id"], **result}
+    result["worker"] = os.getpid()
+    return result
+
+
+def iter_solve(instances, workers=1, chunksize=1, **defaults):
+    tasks = ((instance, defaults) for instance in instances)
+    if workers == 1:
+        yield from map(_solve_task, tasks)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(_solve_task, tasks, chunksize)
+
+
+def solve_batch(instances, workers=None, chunksize=1, **defaults):
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results = list(iter_solve(instances, workers, chunksize, **defaults))
+    return {
+        "workers": workers,
+        "instances": len(results),
+        "seconds": round(time.perf_counter() - started, 6),
+        "results": results,
+    }
@@ -0,0 +1,58 @@
+from facts import RIGHT
+
+
+def chunked_maxima(times, capacity):
+    ordered = sorted(times, reverse=True)
+    return sum(ordered[::capacity])
+
+
+def paired_maxima(times, returns, second):
+    ordered = sorted(times, reverse=True)
+    best = float("inf")
+    for doubles in range(returns // 2 + 1):
+        paired = 2 * doubles + 2
+        escorted = sum(max(time, second) for time in ordered[paired:])
+        cost = doubles * second + sum(ordered[:paired:2]) + escorted
+        best = min(best, cost)
+    return best
+
+
+def forward_trips(count, capacity):
+    if count <= capacity:
+        return 1
+    if capacity < 2:
+        return float("inf")
+    return 1 + -(-(count - capacity) // (capacity - 1))
+
+
+def remaining_time_lower_bound(roster, left, flashlight_location, capacity=2):
+    key = ((left << 1) | flashlight_location, capacity)
+    bound = roster.lower_bounds.get(key)
+    if bound is None:
+        bound = roster.lower_bounds[key] = side_lower_bound(
+            roster, left, flashlight_location, capacity
+        )
+    return bound
+
+
+def side_lower_bound(roster, left, flashlight_location, capacity):
+    if left == 0:
+        return 0.0
+    times = roster.times
+    fastest = times[roster.by_time[0]]
+    second = times[roster.by_time[min(1, len(times) - 1)]]
+    waiting = [times[index] for index in roster.members(left)]
+    bound = 0.0
+    if flashlight_location == RIGHT:
+        right = roster.full_mask & ~left
+        returner = min(times[index] for index in roster.members(right))
+        waiting.append(returner)
+        bound += returner
+    returns = forward_trips(len(waiting), capacity) - 1
+    if returns == float("inf"):
+        return returns
+    if capacity == 2:
+        bound += paired_maxima(waiting, returns, second)
+    else:
+        bound += chunked_maxima(waiting + [fastest] * returns, capacity)
+    return bound + returns * fastest
@@ -0,0 +1,74 @@
+from collections import Counter
+
+from facts import LEFT, RIGHT
+
+CONSTRAINTS = (
+    "time_limit",
+    "flashlight",
+    "bridge_capacity",
+    "move_pattern",
+    "flashlight_location",
+    "empty_side_crossing",
+)
+
+
+def compile_constraints(max_time, capacity):
+    return (
+        (
+            "time_limit",
+            lambda left, right, location, elapsed, action, group: elapsed > max_time,
+        ),
+        (
+            "flashlight",
+            lambda left, right, location, elapsed, action, group: (
+                location == LEFT and not left
+            )
+            or (location == RIGHT and not right),
+        ),
+        (
+            "bridge_capacity",
+            lambda left, right, location, elapsed, action, group: action == "cross"
+            and group.bit_count() > capacity,
+        ),
+        (
+            "move_pattern",
+            lambda left, right, location, elapsed, action, group: (
+                action == "cross" and group.bit_count() < (2 if left else 1)
+            )
+            or (action == "return" and group.bit_count() != 1),
+        ),
+        (
+            "flashlight_location",
+            lambda left, right, location, elapsed, action, group: (
+                action == "cross" and location != RIGHT
+            )
+            or (action == "return" and location != LEFT),
+        ),
+        (
+            "empty_side_crossing",
+            lambda left, right, location, elapsed, action, group: action == "cross"
+            and not group,
+        ),
+    )
+
+
+class ConstraintChecker:
+    def __init__(self, max_time, capacity):
+        self.rejections = Counter()
+        self.checks = compile_constraints(max_time, capacity)
+
+    def accepts(self, left, right, flashlight_location, elapsed_time, move):
+        action, group, _ = move
+        for name, violated in self.checks:
+            if violated(left, right, flashlight_location, elapsed_time, action, group):
+                self.rejections[name] += 1
+                return False
+        return True
+
+    def as_dict(self):
+        return {name: self.rejections[name] for name in CONSTRAINTS}
+
+    def summary(self):
+        rejected = sum(self.rejections.values())
+        counts = ", ".join(f"{name}={self.rejections[name]}" for name in CONSTRAINTS)
+        return f"Rejected successors: {rejected} ({counts})"
@@ -1,12 +1,26 @@
 from experta import Fact, Field
 
+LEFT = 0
+RIGHT = 1
+SIDE_NAMES = ("left", "right")
+
 
 class State(Fact):
-    left = Field(list)
-    right = Field(list)
-    flashlight_location = Field(str)
+    left = Field(int)
+    right = Field(int)
+    flashlight_location = Field(int)
     elapsed_time = Field(float)
-    path = Field(list)
+    path = Field(object)
+    depth = Field(int)
+    sequence = Field(int, mandatory=False)
+
+
+class BackwardState(Fact):
+    left = Field(int)
+    right = Field(int)
+    flashlight_location = Field(int)
+    remaining_time = Field(float)
+    path = Field(object)
     depth = Field(int)
     sequence = Field(int, mandatory=False)
 
@@ -15,47 +29,44 @@ class TimeConstraint(Fact):
     max_time = Field(float)
 
 
+class BridgeCapacity(Fact):
+    capacity = Field(int)
+
+
 class ValidTimeWindow(Fact):
-    state_ref = Field(object)
+    state_id = Field(int)
     elapsed_time = Field(float)
 
 
 class SufficientPeople(Fact):
-    state_ref = Field(object)
+    state_id = Field(int)
     side = Field(str)
     count = Field(int)
 
 
 class ValidMoveCondition(Fact):
-    state_ref = Field(object)
+    state_id = Field(int)
     move_type = Field(str)
-    left = Field(list)
-    right = Field(list)
+    left = Field(int)
+    right = Field(int)
     elapsed_time = Field(float)
-    path = Field(list)
+    path = Field(object)
     depth = Field(int)
     sequence = Field(int)
 
 
 class PotentialState(Fact):
-    left = Field(list)
-    right = Field(list)
-    flashlight_location = Field(str)
+    left = Field(int)
+    right = Field(int)
+    flashlight_location = Field(int)
     elapsed_time = Field(float)
-    path = Field(list)
+    path = Field(object)
     depth = Field(int)
     move_type = Field(str)
 
 
-class VisitedState(Fact):
-    left = Field(list)
-    right = Field(list)
-    flashlight_location = Field(str)
-    best_time = Field(float)
-
-
 class StateToRetract(Fact):
-    state_ref = Field(object)
+    state_id = Field(int)
     violation_type = Field(str)
     details = Field(str)
 
@@ -79,14 +90,13 @@ class SearchAlgorithm(Fact):
     algorithm = "bfs"
 
 
-class ProcessedState(Fact):
-    sequence = Field(int)
+class TraceNodes(Fact):
+    pass
 
 
-class ActiveState(Fact):
-    state_ref = Field(object)
+class FusedExpansion(Fact):
+    pass
 
 
-class BFSQueue(Fact):
-    current_depth = Field(int)
-    processing_depth = Field(int)
+class MeetInTheMiddle(Fact):
+    pass
@@ -0,0 +1,69 @@
+from roster import Roster, dominance_rules
+
+
+class IncrementalMixin:
+    warm_visited = False
+    resolve_stats = None
+
+    def finds_optimal_only(self):
+        return False
+
+    def can_resolve(self, people, capacity, symmetry, dominance, **options):
+        return (
+            sorted(name for name, _ in people) == sorted(self.roster.names)
+            and capacity == self.capacity
+            and symmetry == self.roster.symmetric
+            and dominance_rules(dominance) == self.roster.dominance
+            and all(getattr(self, name) == value for name, value in options.items())
+        )
+
+    def changed_people(self, people):
+        times = dict(people.items() if isinstance(people, dict) else people)
+        if sorted(times) != sorted(self.roster.names):
+            raise ValueError(
+                "resolve only changes crossing times; configure the engine "
+                "for a different roster"
+            )
+        people = [(name, float(times[name])) for name in self.roster.names]
+        changed = slower = 0
+        for person, (old, (_, new)) in enumerate(zip(self.roster.times, people)):
+            changed |= (new != old) << person
+            slower |= (new > old) << person
+        return people, changed, slower
+
+    def resolve(self, people=None, max_time=None):
+        people, changed, slower = self.changed_people(
+            self.people if people is None else people
+        )
+        previous_max_time = self.max_time
+        max_time = previous_max_time if max_time is None else float(max_time)
+        self.resolve_stats = {
+            "changed": self.roster.names_of(changed),
+            "invalidated": 0,
+            "kept": len(self.visited),
+            "searched": False,
+        }
+        if not changed and self.finds_optimal_only() and len(self.visited):
+            best_time = min(
+                (solution["total_time"] for solution in self.solutions), default=None
+            )
+            if best_time is not None or max_time <= previous_max_time:
+                self.max_time = max_time
+                self.solutions = [
+                    solution
+                    for solution in self.solutions
+                    if solution["total_time"] <= max_time
+                ]
+                return self.solutions
+
+        if changed:
+            self.people = dict(people)
+            self.roster = Roster(people, self.roster.symmetric, self.roster.dominance)
+        self.resolve_stats["invalidated"] = self.visited.invalidate(slower)
+        self.resolve_stats["kept"] = len(self.visited)
+        self.resolve_stats["searched"] = True
+        self.warm_visited = True
+        try:
+            return self.solve(max_time)
+        finally:
+            self.warm_visited = False
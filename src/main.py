@@ -1,28 +1,389 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
 from facts import *
+from search_log import SearchLog
+from batch import STRATEGIES, build_solver, cost_result, engine_result, iter_solve
+from solution_cache import (
+    SolutionCache,
+    cache_key,
+    canonical_people,
+    hit_summary,
+    pack,
+    unpack,
+)
+
+DEFAULT_PEOPLE = [
+    ("You", 1),
+    ("Lab Assistant", 2),
+    ("Worker", 5),
+    ("Scientist", 10),
+]
+
+
+def parse_people(spec):
+    people = []
+    for entry in spec.split(","):
+        name, separator, travel_time = entry.rpartition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"expected NAME=TIME, got {entry!r}")
+        people.append((name.strip(), float(travel_time)))
+    return people
 
 
 class BridgePuzzleRunner:
-    def __init__(self):
-        self.travel_time = [
-            ("You", 1),
-            ("Lab Assistant", 2),
-            ("Worker", 5),
-            ("Scientist", 10),
-        ]
-        self.max_time = 17
+    def __init__(
+        self,
+        travel_time=None,
+        max_time=17,
+        strategy="dfs",
+        capacity=2,
+        log=None,
+        symmetry=False,
+        expand=False,
+        dominance=False,
+        mode="all",
+        profile=False,
+        agenda=None,
+        lifecycle=False,
+        fused=False,
+        cache=None,
+        bidirectional=False,
+    ):
+        self.travel_time = list(travel_time or DEFAULT_PEOPLE)
+        self.max_time = max_time
+        self.strategy = strategy
+        self.capacity = capacity
+        self.log = log
+        self.symmetry = symmetry
+        self.expand = expand
+        self.dominance = dominance
+        self.mode = mode
+        self.profile = profile
+        self.agenda = agenda
+        self.lifecycle = lifecycle
+        self.fused = fused
+        self.cache = cache
+        self.bidirectional = bidirectional
+
+    def solve(self, people=None):
+        engine = build_solver(
+            self.strategy,
+            self.travel_time if people is None else people,
+            self.max_time,
+            self.capacity,
+            self.symmetry,
+            self.dominance,
+            self.log,
+            self.mode,
+            self.profile,
+            self.agenda,
+            self.lifecycle,
+            self.fused,
+            self.bidirectional,
+        )
+        started = time.perf_counter()
+        engine.solve()
+        elapsed = time.perf_counter() - started
+        return engine, elapsed
 
     def run(self):
-        strategy = input("Choose search strategy (bfs/dfs): ").strip().lower()
+        if self.cache is not None and not self.profile:
+            return self.run_cached()
+        engine, elapsed = self.solve()
+        engine.print_final_summary()
+        self.profile and print(engine.profiler.table(), file=sys.stderr)
+        return self.result(engine, elapsed)
+
+    def run_cached(self):
+        started = time.perf_counter()
+        people = canonical_people(self.travel_time)
+        key = cache_key(
+            self.strategy,
+            people,
+            self.max_time,
+            self.capacity,
+            self.symmetry,
+            self.dominance,
+            self.mode,
+            self.agenda,
+            self.lifecycle,
+            self.fused,
+            self.expand,
+            self.bidirectional,
+        )
+        tier, value = self.cache.get(key)
+        log = self.log if self.log is not None else SearchLog()
+        if value is None:
+            engine, elapsed = self.solve(people)
+            engine.print_final_summary()
+            result = self.result(engine, elapsed, people)
+            self.cache.put(key, pack(result, people))
+        else:
+            result = unpack(value, people)
+            result["seconds"] = round(time.perf_counter() - started, 6)
+            self.print_cached_summary(result, tier, log)
+        result["cache"] = tier
+        log.summary(self.cache.summary())
+        log.flush()
+        return result
+
+    def print_cached_summary(self, result, tier, log):
+        solutions = result["solutions"]
+        log.summary(f"\n{'='*80}")
+        log.summary(f"FINAL SUMMARY: {len(solutions)} SOLUTION(S) FOUND ({tier} cache)")
+        log.summary("=" * 80)
+        for i, solution in enumerate(solutions, 1):
+            log.summary(f"\nSolution {i}: {solution['total_time']} minutes")
+            for j, (action, people, time_taken) in enumerate(solution["moves"], 1):
+                if action == "cross":
+                    log.summary(
+                        f"  Step {j}: {' and '.join(people)} cross → {time_taken} min"
+                    )
+                else:
+                    log.summary(f"  Step {j}: {people[0]} returns → {time_taken} min")
+        solutions or log.summary("No solutions found within the time limit.")
+        log.summary("=" * 80)
+
+    def result(self, engine, elapsed, people=None):
+        result = engine_result(
+            engine,
+            self.strategy,
+            self.travel_time if people is None else people,
+            self.max_time,
+            self.capacity,
+            elapsed,
+            self.expand,
+        )
+        if self.profile:
+            result["profile"] = engine.profiler.as_dict()
+        return result
+
+
+def run_batch(source, sink, args):
+    instances = (line for line in source if line.strip())
+    results = iter_solve(
+        instances,
+        args.workers,
+        args.chunksize,
+        strategy=args.strategy,
+        max_time=args.max_time,
+        capacity=args.capacity,
+        symmetry=args.symmetry,
+        dominance=args.dominance,
+        expand=args.expand,
+        cost_only=args.cost_only,
+        mode=args.mode,
+        lifecycle=args.lifecycle,
+        fused=args.fused,
+        bidirectional=args.bidirectional,
+        incremental=args.incremental,
+        cache=args.cache,
+        cache_limit=args.cache_size << 20,
+    )
+    tiers = Counter()
+    for result in results:
+        tiers[result.get("cache")] += 1
+        sink.write(json.dumps(result) + "\n")
+    sink.flush()
+    args.cache and print(
+        hit_summary(tiers["memory"], tiers["disk"], tiers["miss"]), file=sys.stderr
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Solve the bridge-crossing puzzle.")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="dfs")
+    parser.add_argument(
+        "--people",
+        type=parse_people,
+        default=DEFAULT_PEOPLE,
+        help="comma-separated NAME=TIME pairs, e.g. 'A=1,B=2,C=5,D=10'",
+    )
+    parser.add_argument("--capacity", type=int, default=2)
+    parser.add_argument(
+        "--mode",
+        choices=("all", "optimal", "best", "first"),
+        default="all",
+        help="dfs/fast only: every schedule within the limit, all the optimal "
+        "ones, a single optimal one, or the first one found; the number of optimal "
+        "schedules grows exponentially with the roster, so past about 8 people "
+        "only best stays interactive (with --lifecycle --fused for dfs)",
+    )
+    parser.add_argument(
+        "--lifecycle",
+        action="store_true",
+        help="dfs only: retract intermediate facts and expanded states once "
+        "they are consumed, keeping working memory bounded",
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="dfs only: expand each state into its successor states in one rule "
+        "firing instead of the chain of condition facts",
+    )
+    parser.add_argument(
+        "--bidirectional",
+        action="store_true",
+        help="bfs only: also search backward from the goal and splice the two "
+        "halves where they meet at half the time limit",
+    )
+    parser.add_argument("--max-time", type=float, default=17.0)
+    parser.add_argument(
+        "--symmetry",
+        action="store_true",
+        help="treat people with equal crossing times as interchangeable",
+    )
+    parser.add_argument(
+        "--dominance",
+        action="store_true",
+        help="prune moves that no optimal schedule needs (keeps the optimal time, "
+        "not every feasible schedule)",
+    )
+    parser.add_argument(
+        "--expand",
+        action="store_true",
+        help="expand symmetric solutions to every assignment of names",
+    )
+    parser.add_argument(
+        "--log-level", choices=("off", "solutions", "summary", "nodes"), default="nodes"
+    )
+    parser.add_argument("--sample-every", type=int, default=1)
+    parser.add_argument(
+        "--cost-only",
+        action="store_true",
+        help="only report the optimal time (closed form for capacity 2)",
+    )
+    parser.add_argument(
+        "--agenda",
+        choices=("depth", "breadth", "cheapest"),
+        help="dfs/bfs only: order rule activations by state depth or elapsed time "
+        "(defaults: dfs=depth, bfs=breadth); fast: depth mirrors dfs, breadth "
+        "mirrors bfs",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every rule and print a per-rule table (stderr) after the run",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print the result as one JSON object"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="JSONL file of instances ('-' for stdin); one JSON result per line",
+    )
+    parser.add_argument(
+        "--output", metavar="FILE", default="-", help="batch output ('-' for stdout)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="batch worker processes (0 = one per CPU)",
+    )
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument(
+        "--cache",
+        metavar="FILE",
+        help="SQLite file for the solution cache; rosters with the same times, "
+        "capacity, time limit and options are answered without a search",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="evict the least recently used cache entries above this size",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="batch only: when an instance keeps the previous roster and only "
+        "changes crossing times or --max-time, re-solve from the worker's last "
+        "visited table instead of starting over; only for searches that return "
+        "optimal schedules alone (astar, ucs, or --mode optimal/best), the others "
+        "solve from scratch",
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.capacity < 1:
+        parser.error("--capacity must be at least 1")
+    if args.agenda and args.strategy in ("astar", "ucs") and not args.batch:
+        parser.error(f"--strategy {args.strategy} always expands the cheapest state")
+    if args.agenda == "cheapest" and args.strategy == "fast" and not args.batch:
+        parser.error("--agenda cheapest needs --strategy dfs or bfs")
+    fast_breadth = args.strategy == "fast" and args.agenda == "breadth"
+    if fast_breadth and args.mode != "all" and not args.batch:
+        parser.error(f"--strategy fast with --mode {args.mode} needs depth-first order")
+    if args.mode != "all" and args.strategy not in ("dfs", "fast") and not args.batch:
+        parser.error(f"--mode {args.mode} needs --strategy dfs or fast")
+    enumerates = args.mode == "all" and args.strategy not in ("astar", "ucs")
+    if args.dominance and enumerates and not args.batch:
+        parser.error("--dominance with --mode all needs --strategy astar or ucs")
+    if args.lifecycle and args.strategy != "dfs" and not args.batch:
+        parser.error("--lifecycle needs --strategy dfs")
+    if args.fused and args.strategy != "dfs" and not args.batch:
+        parser.error("--fused needs --strategy dfs")
+    if args.bidirectional and args.strategy != "bfs" and not args.batch:
+        parser.error("--bidirectional needs --strategy bfs")
+    if args.profile and args.strategy == "fast" and not args.batch:
+        parser.error("--profile needs a rule-engine strategy, not --strategy fast")
+
+    if args.batch:
+        source = sys.stdin if args.batch == "-" else open(args.batch)
+        sink = sys.stdout if args.output == "-" else open(args.output, "w")
+        args.workers = args.workers or os.cpu_count() or 1
+        try:
+            run_batch(source, sink, args)
+        finally:
+            source is sys.stdin or source.close()
+            sink is sys.stdout or sink.close()
+        return 0
 
-        if strategy == "bfs":
-            from Bfs.engine_bfs import BridgePuzzleSolverBfs as Solver
+    if args.cost_only:
+        result = cost_result(args.people, args.max_time, args.capacity)
+        if args.json:
+            print(json.dumps(result))
+        elif result["feasible"]:
+            print(f"Optimal time: {result['best_time']} minutes")
         else:
-            from Dfs.engine import BridgePuzzleSolver as Solver
+            print(f"No schedule fits in {args.max_time} minutes.")
+        return 0
 
-        engine = Solver(self.travel_time, self.max_time)
-        engine.reset()
-        engine.run()
+    runner = BridgePuzzleRunner(
+        args.people,
+        args.max_time,
+        args.strategy,
+        args.capacity,
+        SearchLog("off" if args.json else args.log_level, args.sample_every),
+        args.symmetry,
+        args.expand,
+        args.dominance,
+        args.mode,
+        args.profile,
+        args.agenda,
+        args.lifecycle,
+        args.fused,
+        args.cache and SolutionCache(args.cache, disk_limit=args.cache_size << 20),
+        args.bidirectional,
+    )
+    try:
+        result = runner.run()
+    finally:
+        runner.cache is None or runner.cache.close()
+    args.json and print(json.dumps(result))
+    return 0
 
 
-runner = BridgePuzzleRunner()
-runner.run()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import resource
+import sys
+import time
+from collections import Counter
+
+from experta.agenda import Agenda
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class EngineMetrics:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.rules_fired = 0
+        self.firings = Counter()
+        self.facts_declared = 0
+        self.facts_retracted = 0
+        self.peak_facts = 0
+        self.wall_time = 0.0
+
+    def as_dict(self):
+        return {
+            "wall_time": round(self.wall_time, 6),
+            "rules_fired": self.rules_fired,
+            "facts_declared": self.facts_declared,
+            "facts_retracted": self.facts_retracted,
+            "peak_facts": self.peak_facts,
+            "peak_rss_kb": peak_rss_kb(),
+            "firings": dict(self.firings.most_common()),
+        }
+
+
+class CountingAgenda(Agenda):
+    def __init__(self, metrics, activations=()):
+        super().__init__()
+        self.metrics = metrics
+        self.activations.extend(activations)
+
+    def get_next(self):
+        activation = super().get_next()
+        if activation is not None:
+            self.metrics.rules_fired += 1
+            self.metrics.firings[activation.rule.__name__] += 1
+        return activation
+
+
+class MetricsMixin:
+    def reset(self, **kwargs):
+        self.metrics = EngineMetrics()
+        super().reset(**kwargs)
+        self.agenda = CountingAgenda(self.metrics, self.agenda.activations)
+        self.metrics.peak_facts = len(self.facts)
+
+    def declare(self, *facts):
+        result = super().declare(*facts)
+        self.metrics.facts_declared += len(facts)
+        self.metrics.peak_facts = max(self.metrics.peak_facts, len(self.facts))
+        return result
+
+    def retract(self, idx_or_declared_fact):
+        result = super().retract(idx_or_declared_fact)
+        self.metrics.facts_retracted += 1
+        return result
+
+    def run(self, steps=float("inf")):
+        started = time.perf_counter()
+        super().run(steps)
+        self.metrics.wall_time += time.perf_counter() - started
+
+
+def instrument(engine_class):
+    return type(f"Measured{engine_class.__name__}", (MetricsMixin, engine_class), {})
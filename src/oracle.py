@@ -0,0 +1,42 @@
+from bounds import remaining_time_lower_bound
+from facts import LEFT
+
+
+def optimal_time(times, capacity=2):
+    ordered = sorted(times)
+    count = len(ordered)
+    if count == 0:
+        return 0.0
+    if count <= capacity:
+        return ordered[-1]
+    if capacity < 2:
+        return float("inf")
+    if capacity > 2:
+        return None
+
+    fastest, second = ordered[0], ordered[1]
+    total = 0.0
+    while count > 3:
+        slowest, next_slowest = ordered[count - 1], ordered[count - 2]
+        total += min(
+            fastest + 2 * second + slowest,
+            2 * fastest + next_slowest + slowest,
+        )
+        count -= 2
+    if count == 3:
+        return total + fastest + second + ordered[2]
+    return total + second
+
+
+def time_lower_bound(roster, capacity=2):
+    optimum = optimal_time(roster.times, capacity)
+    if optimum is None:
+        return remaining_time_lower_bound(roster, roster.full_mask, LEFT, capacity)
+    return optimum
+
+
+def time_upper_bound(roster, capacity=2):
+    optimum = optimal_time(roster.times, capacity)
+    if optimum is None:
+        return optimal_time(roster.times)
+    return optimum
@@ -0,0 +1,24 @@
+class PathNode:
+    __slots__ = ("parent", "move", "length", "movers")
+
+    def __init__(self, parent, move):
+        self.parent = parent
+        self.move = move
+        self.length = 1 if parent is None else parent.length + 1
+        self.movers = move[1] if parent is None else parent.movers | move[1]
+
+    def duplicates(self, other):
+        return (
+            other is not None
+            and self.parent is other.parent
+            and self.move == other.move
+        )
+
+    def moves(self):
+        moves = []
+        node = self
+        while node is not None:
+            moves.append(node.move)
+            node = node.parent
+        moves.reverse()
+        return moves
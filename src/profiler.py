@@ -0,0 +1,153 @@
+import time
+from functools import wraps
+
+from experta import AND, NOT, OR, TEST, Rule
+
+
+class RuleStats:
+    __slots__ = (
+        "activations",
+        "cancelled",
+        "firings",
+        "rhs_time",
+        "test_calls",
+        "test_time",
+    )
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.activations = 0
+        self.cancelled = 0
+        self.firings = 0
+        self.rhs_time = 0.0
+        self.test_calls = 0
+        self.test_time = 0.0
+
+    def as_dict(self):
+        return {
+            "activations": self.activations,
+            "cancelled": self.cancelled,
+            "firings": self.firings,
+            "rhs_seconds": round(self.rhs_time, 6),
+            "rhs_avg_ms": (
+                round(1000 * self.rhs_time / self.firings, 4) if self.firings else 0.0
+            ),
+            "test_calls": self.test_calls,
+            "test_seconds": round(self.test_time, 6),
+        }
+
+
+class RuleProfiler:
+    def __init__(self):
+        self.rules = {}
+
+    def clear(self):
+        for stats in self.rules.values():
+            stats.clear()
+
+    def stats(self, name):
+        stats = self.rules.get(name)
+        if stats is None:
+            stats = self.rules[name] = RuleStats()
+        return stats
+
+    def ranked(self):
+        return sorted(
+            self.rules.items(),
+            key=lambda item: item[1].rhs_time + item[1].test_time,
+            reverse=True,
+        )
+
+    def as_dict(self):
+        return {name: stats.as_dict() for name, stats in self.ranked()}
+
+    def table(self):
+        lines = [
+            f"{'rule':<34} {'activ':>8} {'cancel':>7} {'fired':>7} "
+            f"{'rhs_s':>9} {'avg_ms':>8} {'tests':>8} {'test_s':>9}"
+        ]
+        for name, stats in self.ranked():
+            row = stats.as_dict()
+            lines.append(
+                f"{name:<34} {row['activations']:>8} {row['cancelled']:>7} "
+                f"{row['firings']:>7} {row['rhs_seconds']:>9.4f} "
+                f"{row['rhs_avg_ms']:>8.3f} {row['test_calls']:>8} "
+                f"{row['test_seconds']:>9.4f}"
+            )
+        return "\n".join(lines)
+
+    def timed_test(self, name, test):
+        stats = self.stats(name)
+
+        @wraps(test)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return test(*args, **kwargs)
+            finally:
+                stats.test_calls += 1
+                stats.test_time += time.perf_counter() - started
+
+        return timed
+
+    def timed_action(self, name, action):
+        stats = self.stats(name)
+
+        @wraps(action)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return action(*args, **kwargs)
+            finally:
+                stats.firings += 1
+                stats.rhs_time += time.perf_counter() - started
+
+        return timed
+
+    def timed_conditions(self, name, conditions):
+        for condition in conditions:
+            if isinstance(condition, TEST):
+                yield TEST(self.timed_test(name, condition[0]))
+            elif isinstance(condition, (AND, OR, NOT)):
+                yield condition.__class__(*self.timed_conditions(name, condition))
+            else:
+                yield condition
+
+    def profiled_rule(self, rule):
+        name = rule.__name__
+        conditions = self.timed_conditions(name, rule)
+        profiled = Rule(*conditions, salience=rule.salience)
+        return profiled(self.timed_action(name, rule._wrapped))
+
+    def count_activations(self, update_agenda):
+        @wraps(update_agenda)
+        def counted(agenda, added, removed):
+            for activation in added:
+                self.stats(activation.rule.__name__).activations += 1
+            for activation in removed:
+                self.stats(activation.rule.__name__).cancelled += 1
+            return update_agenda(agenda, added, removed)
+
+        return counted
+
+
+class ProfilingMixin:
+    def __init__(self, *args, **kwargs):
+        self.profiler = RuleProfiler()
+        super().__init__(*args, **kwargs)
+        self.strategy.update_agenda = self.profiler.count_activations(
+            self.strategy.update_agenda
+        )
+
+    def get_rules(self):
+        return [self.profiler.profiled_rule(rule) for rule in super().get_rules()]
+
+    def reset(self, **kwargs):
+        self.profiler.clear()
+        super().reset(**kwargs)
+
+
+def profiled(engine_class):
+    return type(f"Profiled{engine_class.__name__}", (ProfilingMixin, engine_class), {})
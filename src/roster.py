@@ -0,0 +1,145 @@
+from itertools import combinations, product
+
+DOMINANCE_RULES = ("fastest_return",)
+
+
+def dominance_rules(dominance):
+    if dominance is True:
+        dominance = DOMINANCE_RULES
+    rules = frozenset(dominance or ())
+    unknown = rules.difference(DOMINANCE_RULES)
+    if unknown:
+        raise ValueError(f"unknown dominance rules: {sorted(unknown)}")
+    return rules
+
+
+class Roster:
+    def __init__(self, people, symmetric=False, dominance=False):
+        self.symmetric = symmetric
+        self.dominance = dominance_rules(dominance)
+        self.names = [name for name, _ in people]
+        self.times = [float(time) for _, time in people]
+        self.ids = {name: index for index, name in enumerate(self.names)}
+        self.full_mask = (1 << len(self.names)) - 1
+        self.by_time = sorted(range(len(self.names)), key=self.times.__getitem__)
+        self.lower_bounds = {}
+        self.classes = {}
+        for index in self.by_time:
+            self.classes.setdefault(self.times[index], []).append(index)
+
+    def __len__(self):
+        return len(self.names)
+
+    def members(self, mask):
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(low.bit_length() - 1)
+            mask ^= low
+        return ids
+
+    def names_of(self, mask):
+        return [self.names[index] for index in self.members(mask)]
+
+    def crossing_groups(self, mask, capacity, budget=float("inf")):
+        if self.symmetric:
+            yield from self._class_groups(mask, capacity, budget)
+            return
+        members = [index for index in self.by_time if mask >> index & 1]
+        smallest = min(2, len(members))
+        for position, slowest in enumerate(members):
+            crossing_time = self.times[slowest]
+            if crossing_time > budget:
+                break
+            largest = min(capacity, position + 1)
+            for size in range(smallest, largest + 1):
+                for companions in combinations(members[:position], size - 1):
+                    group = 1 << slowest
+                    for index in companions:
+                        group |= 1 << index
+                    yield group, crossing_time
+
+    def _class_groups(self, mask, capacity, budget):
+        present = []
+        for crossing_time, ids in self.classes.items():
+            available = [index for index in ids if mask >> index & 1]
+            available and present.append((crossing_time, available))
+        smallest = min(2, sum(len(available) for _, available in present))
+        for position, (crossing_time, available) in enumerate(present):
+            if crossing_time > budget:
+                break
+            for taken in range(1, min(capacity, len(available)) + 1):
+                slowest = self.mask_of_ids(available[:taken])
+                faster = self._class_counts(present[:position], capacity - taken)
+                for group, count in faster:
+                    if taken + count >= smallest:
+                        yield slowest | group, crossing_time
+
+    def _class_counts(self, present, room):
+        if not present or not room:
+            yield 0, 0
+            return
+        _, available = present[0]
+        for taken in range(min(room, len(available)) + 1):
+            head = self.mask_of_ids(available[:taken])
+            for group, count in self._class_counts(present[1:], room - taken):
+                yield head | group, taken + count
+
+    def return_candidates(self, mask):
+        if not self.symmetric:
+            candidates = self.members(mask)
+        else:
+            candidates = []
+            for ids in self.classes.values():
+                present = [index for index in ids if mask >> index & 1]
+                present and candidates.append(present[-1])
+        if "fastest_return" in self.dominance and candidates:
+            return [min(candidates, key=self.times.__getitem__)]
+        return candidates
+
+    def mask_of_ids(self, ids):
+        mask = 0
+        for index in ids:
+            mask |= 1 << index
+        return mask
+
+    def expand_solutions(self, solutions):
+        for solution in solutions:
+            yield from self.expand_solution(solution)
+
+    def expand_solution(self, solution):
+        if not self.symmetric:
+            yield solution
+            return
+        for moves in self._expand_moves(solution["moves"], self.full_mask):
+            yield {**solution, "moves": moves}
+
+    def _expand_moves(self, moves, left):
+        if not moves:
+            yield []
+            return
+        action, names, time_taken = moves[0]
+        side = left if action == "cross" else self.full_mask & ~left
+        counts = {}
+        for name in names:
+            crossing_time = self.times[self.ids[name]]
+            counts[crossing_time] = counts.get(crossing_time, 0) + 1
+        choices = [
+            combinations(
+                [index for index in self.classes[crossing_time] if side >> index & 1],
+                count,
+            )
+            for crossing_time, count in counts.items()
+        ]
+        for picked in product(*choices):
+            group = self.mask_of_ids(index for ids in picked for index in ids)
+            move = (action, tuple(self.names_of(group)), time_taken)
+            for rest in self._expand_moves(moves[1:], left ^ group):
+                yield [move] + rest
+
+    def decode_move(self, move):
+        action, group, time_taken = move
+        return (action, tuple(self.names_of(group)), time_taken)
+
+    def decode_path(self, path):
+        return [self.decode_move(move) for move in path]
@@ -0,0 +1,11 @@
+def random_roster(rng, size, slowest):
+    return [(f"P{index}", float(rng.randint(1, slowest))) for index in range(size)]
+
+
+def optimal_schedules(solutions):
+    best_time = min((solution["total_time"] for solution in solutions), default=None)
+    return best_time, sorted(
+        str(solution["moves"])
+        for solution in solutions
+        if solution["total_time"] == best_time
+    )
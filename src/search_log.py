@@ -0,0 +1,61 @@
+import sys
+
+OFF = 0
+SOLUTIONS = 1
+SUMMARY = 2
+NODES = 3
+
+LEVELS = {"off": OFF, "solutions": SOLUTIONS, "summary": SUMMARY, "nodes": NODES}
+
+RED = "31"
+GREEN = "32"
+YELLOW = "33"
+BLUE = "34"
+BOLD = "1"
+
+
+class SearchLog:
+    def __init__(self, level="nodes", sample_every=1, stream=None, buffer_lines=512):
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        self.sample_every = max(1, sample_every)
+        self.stream = stream if stream is not None else sys.stdout
+        isatty = getattr(self.stream, "isatty", None)
+        self.color = bool(isatty and isatty())
+        self.buffer_lines = buffer_lines
+        self.buffer = []
+        self.node_count = 0
+
+    @property
+    def traces_nodes(self):
+        return self.level >= NODES
+
+    def paint(self, code, text):
+        return f"\033[{code}m{text}\033[0m" if self.color else text
+
+    def write(self, level, *lines):
+        if self.level < level:
+            return
+        self.buffer.extend(lines)
+        len(self.buffer) >= self.buffer_lines and self.flush()
+
+    def solution(self, *lines):
+        self.write(SOLUTIONS, *lines)
+
+    def summary(self, *lines):
+        self.write(SUMMARY, *lines)
+
+    def sample_node(self):
+        if self.level < NODES:
+            return False
+        self.node_count += 1
+        return (self.node_count - 1) % self.sample_every == 0
+
+    def node(self, *lines):
+        self.write(NODES, *lines)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.stream.write("\n".join(self.buffer) + "\n")
+        self.stream.flush()
+        self.buffer.clear()
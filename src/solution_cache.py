@@ -0,0 +1,214 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+from roster import dominance_rules
+
+MEMORY_LIMIT = 16 << 20
+DISK_LIMIT = 256 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+
+def canonical_people(people):
+    return sorted(people, key=lambda person: person[1])
+
+
+def cache_key(
+    strategy,
+    people,
+    max_time,
+    capacity=2,
+    symmetry=False,
+    dominance=False,
+    mode="all",
+    agenda=None,
+    lifecycle=False,
+    fused=False,
+    expand=False,
+    bidirectional=False,
+):
+    return json.dumps(
+        [
+            strategy,
+            sorted(float(travel_time) for _, travel_time in people),
+            float(max_time),
+            capacity,
+            bool(symmetry),
+            sorted(dominance_rules(dominance)),
+            mode,
+            agenda,
+            bool(lifecycle),
+            bool(fused),
+            bool(expand),
+            bool(bidirectional),
+        ]
+    )
+
+
+def pack(result, people):
+    slots = {name: slot for slot, (name, _) in enumerate(people)}
+    entry = {key: value for key, value in result.items() if key != "seconds"}
+    entry["people"] = [float(travel_time) for _, travel_time in people]
+    entry["solutions"] = [
+        {
+            **solution,
+            "moves": [
+                [action, [slots[name] for name in names], time_taken]
+                for action, names, time_taken in solution["moves"]
+            ],
+        }
+        for solution in result["solutions"]
+    ]
+    return json.dumps(entry)
+
+
+def unpack(value, people):
+    names = [name for name, _ in people]
+    result = json.loads(value)
+    result["people"] = [[name, float(travel_time)] for name, travel_time in people]
+    for solution in result["solutions"]:
+        solution["moves"] = [
+            [action, [names[slot] for slot in slots], time_taken]
+            for action, slots, time_taken in solution["moves"]
+        ]
+    return result
+
+
+def hit_summary(memory_hits, disk_hits, misses):
+    lookups = memory_hits + disk_hits + misses
+    hits = memory_hits + disk_hits
+    rate = hits / lookups if lookups else 0.0
+    return (
+        f"Solution cache: {hits}/{lookups} hits ({rate:.1%}; "
+        f"memory={memory_hits}, disk={disk_hits})"
+    )
+
+
+class SolutionCache:
+    def __init__(self, path=None, memory_limit=MEMORY_LIMIT, disk_limit=DISK_LIMIT):
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.used = {}
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute(SCHEMA)
+            self.db.commit()
+
+    def __len__(self):
+        return len(self.memory)
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory.move_to_end(key)
+            self.touch(key)
+            self.memory_hits += 1
+            return "memory", value
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT value FROM solutions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.touch(key)
+                self.disk_hits += 1
+                self.remember(key, row[0])
+                return "disk", row[0]
+        self.misses += 1
+        return "miss", None
+
+    def touch(self, key):
+        if self.db is not None:
+            self.used[key] = time.time()
+
+    def flush_used(self):
+        self.db.executemany(
+            "UPDATE solutions SET used = ? WHERE key = ?",
+            [(used, key) for key, used in self.used.items()],
+        )
+        self.used.clear()
+
+    def put(self, key, value):
+        self.remember(key, value)
+        if self.db is None:
+            return
+        self.db.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()),
+        )
+        self.used.pop(key, None)
+        self.flush_used()
+        self.evict_disk()
+        self.db.commit()
+
+    def remember(self, key, value):
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_size -= len(previous)
+        self.memory[key] = value
+        self.memory_size += len(value)
+        while self.memory_size > self.memory_limit:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
+            self.memory_evictions += 1
+
+    def evict_disk(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM solutions")
+        total = total.fetchone()[0]
+        if total <= self.disk_limit:
+            return
+        stale = []
+        for key, size in self.db.execute(
+            "SELECT key, size FROM solutions ORDER BY used"
+        ).fetchall():
+            if total <= self.disk_limit:
+                break
+            stale.append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM solutions WHERE key = ?", stale)
+        self.disk_evictions += len(stale)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            ),
+            "memory_entries": len(self.memory),
+            "memory_size": self.memory_size,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+        }
+
+    def summary(self):
+        return (
+            f"{hit_summary(self.memory_hits, self.disk_hits, self.misses)}, "
+            f"{len(self.memory)} entries in memory, "
+            f"{self.memory_evictions + self.disk_evictions} evicted"
+        )
+
+    def close(self):
+        if self.db is not None:
+            self.flush_used()
+            self.db.commit()
+            self.db.close()
+        self.db = None
@@ -0,0 +1,32 @@
+class StateBuckets:
+    def __init__(self):
+        self.buckets = {}
+        self.comparisons = 0
+
+    @staticmethod
+    def signature(state):
+        return (state["left"] << 1) | state["flashlight_location"]
+
+    def clear(self):
+        self.buckets.clear()
+        self.comparisons = 0
+
+    def live(self, facts, state):
+        bucket = self.buckets.get(self.signature(state))
+        if not bucket:
+            return []
+        bucket[:] = [
+            other
+            for other in bucket
+            if other is not state and facts.get(other.__factid__) is other
+        ]
+        self.comparisons += len(bucket)
+        return list(bucket)
+
+    def add(self, state):
+        self.buckets.setdefault(self.signature(state), []).append(state)
+
+    def discard(self, state):
+        bucket = self.buckets.get(self.signature(state))
+        if bucket:
+            bucket[:] = [other for other in bucket if other is not state]
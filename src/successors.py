@@ -0,0 +1,51 @@
+from facts import LEFT, RIGHT
+from path_node import PathNode
+from bounds import remaining_time_lower_bound
+
+
+class SuccessorMixin:
+    def within_bound(self, left, flashlight_location, elapsed_time):
+        remaining = remaining_time_lower_bound(
+            self.roster, left, flashlight_location, self.capacity
+        )
+        return elapsed_time + remaining <= self.bound
+
+    def best_first(self, moves):
+        if self.mode != "best":
+            return moves
+        return sorted(
+            moves,
+            key=lambda child: child[3]
+            + remaining_time_lower_bound(
+                self.roster, child[0], child[2], self.capacity
+            ),
+            reverse=True,
+        )
+
+    def crossings(self, left, right, elapsed_time, path, max_time, capacity):
+        groups = self.roster.crossing_groups(left, capacity, max_time - elapsed_time)
+        for group, crossing_time in groups:
+            new_left = left & ~group
+            new_right = right | group
+            new_time = elapsed_time + crossing_time
+            move = ("cross", group, crossing_time)
+            if not self.checker.accepts(new_left, new_right, RIGHT, new_time, move):
+                continue
+            if not self.within_bound(new_left, RIGHT, new_time):
+                continue
+            yield new_left, new_right, RIGHT, new_time, PathNode(path, move)
+
+    def returns(self, left, right, elapsed_time, path):
+        times = self.roster.times
+        for person in self.roster.return_candidates(right):
+            crossing_time = times[person]
+            group = 1 << person
+            new_left = left | group
+            new_right = right & ~group
+            new_time = elapsed_time + crossing_time
+            move = ("return", group, crossing_time)
+            if not self.checker.accepts(new_left, new_right, LEFT, new_time, move):
+                continue
+            if not self.within_bound(new_left, LEFT, new_time):
+                continue
+            yield new_left, new_right, LEFT, new_time, PathNode(path, move)
@@ -0,0 +1,61 @@
+class TranspositionTable:
+    def __init__(self):
+        self.best_times = {}
+        self.movers = {}
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.best_times)
+
+    @staticmethod
+    def key(left, flashlight_location):
+        return (left << 1) | flashlight_location
+
+    def clear(self):
+        self.best_times.clear()
+        self.movers.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def admit(self, left, flashlight_location, elapsed_time, path=None, strict=False):
+        key = self.key(left, flashlight_location)
+        best_time = self.best_times.get(key)
+        movers = 0 if path is None else path.movers
+        if best_time is None:
+            self.misses += 1
+            self.best_times[key] = elapsed_time
+            self.movers[key] = movers
+            return True
+        self.hits += 1
+        if elapsed_time < best_time:
+            self.updates += 1
+            self.best_times[key] = elapsed_time
+            self.movers[key] = movers
+        elif elapsed_time == best_time:
+            self.movers[key] &= movers
+        return elapsed_time < best_time if strict else elapsed_time <= best_time
+
+    def is_stale(self, left, flashlight_location, elapsed_time):
+        best_time = self.best_times.get(self.key(left, flashlight_location))
+        return best_time is not None and elapsed_time > best_time
+
+    def invalidate(self, people_mask):
+        stale = [key for key, movers in self.movers.items() if movers & people_mask]
+        for key in stale:
+            del self.best_times[key]
+            del self.movers[key]
+        return len(stale)
+
+    def stats(self):
+        return {
+            "entries": len(self.best_times),
+            "hits": self.hits,
+            "misses": self.misses,
+            "updates": self.updates,
+        }
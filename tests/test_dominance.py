@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch import build_solver
+from roster import DOMINANCE_RULES
+from sampling import optimal_schedules, random_roster
+from search_log import SearchLog
+
+
+def solve_optimal(strategy, people, capacity, dominance):
+    engine = build_solver(
+        strategy, people, 1000.0, capacity, dominance=dominance, log=SearchLog("off")
+    )
+    engine.solve()
+    best, schedules = optimal_schedules(engine.solutions)
+    return best, set(schedules)
+
+
+class DominanceTest(unittest.TestCase):
+    def test_pruning_keeps_the_optimum(self):
+        rng = random.Random(11)
+        variants = [(rule,) for rule in DOMINANCE_RULES]
+        len(DOMINANCE_RULES) > 1 and variants.append(DOMINANCE_RULES)
+        for trial in range(12):
+            people = random_roster(rng, rng.randint(3, 6), 30)
+            capacity = rng.choice((2, 3, 4))
+            for strategy in ("astar", "bfs"):
+                best, schedules = solve_optimal(strategy, people, capacity, ())
+                for rules in variants:
+                    with self.subTest(trial=trial, strategy=strategy, rules=rules):
+                        pruned_best, pruned = solve_optimal(
+                            strategy, people, capacity, rules
+                        )
+                        self.assertEqual(pruned_best, best)
+                        self.assertLessEqual(pruned, schedules)
+
+
+if __name__ == "__main__":
+    unittest.main()
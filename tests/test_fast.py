@@ -0,0 +1,117 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch import build_solver
+from oracle import optimal_time
+from sampling import random_roster
+from search_log import SearchLog
+
+PAIRS = (
+    ("dfs", "depth", "all"),
+    ("dfs", "depth", "optimal"),
+    ("dfs", "depth", "first"),
+    ("dfs", "depth", "best"),
+    ("bfs", "breadth", "all"),
+)
+
+
+def run(
+    strategy, people, max_time, capacity, symmetry, dominance, mode, agenda, **options
+):
+    engine = build_solver(
+        strategy,
+        people,
+        max_time,
+        capacity,
+        symmetry,
+        dominance,
+        SearchLog("off"),
+        mode,
+        agenda=agenda,
+        **options,
+    )
+    engine.solve()
+    return engine.solutions, engine.visited.stats()
+
+
+class FastSolverTest(unittest.TestCase):
+    def test_matches_rule_engines(self):
+        rng = random.Random(3)
+        for trial in range(12):
+            people = random_roster(rng, rng.randint(2, 5), 12)
+            capacity = rng.choice((2, 3))
+            symmetry = rng.random() < 0.3
+            dominance = rng.random() < 0.3
+            max_time = optimal_time([time for _, time in people]) + rng.choice(
+                (-1.0, 0.0, 4.0)
+            )
+            for strategy, agenda, mode in PAIRS:
+                with self.subTest(trial=trial, strategy=strategy, mode=mode):
+                    expected, expected_stats = run(
+                        strategy,
+                        people,
+                        max_time,
+                        capacity,
+                        symmetry,
+                        dominance,
+                        mode,
+                        None,
+                    )
+                    found, stats = run(
+                        "fast",
+                        people,
+                        max_time,
+                        capacity,
+                        symmetry,
+                        dominance,
+                        mode,
+                        agenda,
+                    )
+                    self.assertEqual(found, expected)
+                    self.assertEqual(stats, expected_stats)
+
+    def test_best_mode_finds_the_optimum(self):
+        rng = random.Random(5)
+        for size in (8, 12, 15):
+            people = random_roster(rng, size, 30)
+            best_time = optimal_time([time for _, time in people])
+            found, _ = run("fast", people, 1000.0, 2, False, False, "best", None)
+            self.assertEqual(
+                [solution["total_time"] for solution in found], [best_time]
+            )
+
+    def test_best_mode_searches_wider_bridges(self):
+        rng = random.Random(9)
+        for size, capacity in ((6, 3), (8, 3), (10, 3), (10, 4)):
+            people = random_roster(rng, size, 30)
+            optimal, _ = run(
+                "fast", people, 1000.0, capacity, False, False, "optimal", None
+            )
+            best_time = min(solution["total_time"] for solution in optimal)
+            for strategy, options in (
+                ("fast", {}),
+                ("dfs", {"lifecycle": True, "fused": True}),
+            ):
+                with self.subTest(size=size, capacity=capacity, strategy=strategy):
+                    found, _ = run(
+                        strategy,
+                        people,
+                        1000.0,
+                        capacity,
+                        False,
+                        False,
+                        "best",
+                        None,
+                        **options,
+                    )
+                    self.assertEqual(
+                        [solution["total_time"] for solution in found], [best_time]
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()